@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from utils.micro_batcher import MicroBatcher
+from utils.registry import get_components, warm_up
+
+# JSON scoring API, served by any ASGI server:
+#   python api.py --port 8000          (uses uvicorn if installed)
+#   uvicorn api:app --workers 4
+#
+#   POST /analyze        {"text": "...", "url": "https://..."}
+#   POST /analyze/batch  {"articles": [{"text": "...", "url": "..."}, ...]}
+#   GET  /health
+
+MAX_BODY_BYTES = 10 * 2 ** 20
+MAX_BATCH_ARTICLES = 1000
+
+# Inference runs on its own small pool so slow source checks cannot starve it
+_analysis_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='analysis')
+_batcher = None
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def analyze_texts(texts):
+    """Clean and score a list of texts with one vectorized model call"""
+    components = get_components()
+    cleaned = [components.preprocessor.clean_text(text) for text in texts]
+    return [
+        {
+            'is_fake': bool(result['is_fake']),
+            'confidence': float(result['confidence']),
+            'indicators': {name: bool(present) for name, present in result['indicators'].items()}
+        }
+        for result in components.analyzer.analyze_batch(cleaned)
+    ]
+
+def get_batcher():
+    """The micro-batcher for single /analyze requests, created on the running loop"""
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(analyze_texts, max_batch_size=256, max_wait=0.005,
+                                executor=_analysis_executor)
+    return _batcher
+
+async def handle_analyze(payload):
+    text, url = _parse_article(payload)
+    loop = asyncio.get_running_loop()
+    if url:
+        source_task = loop.run_in_executor(None, get_components().source_checker.check_source_credibility, url)
+    result = await get_batcher().submit(text)
+    if url:
+        result['source'] = await source_task
+    return result
+
+async def handle_analyze_batch(payload):
+    articles = payload.get('articles') if isinstance(payload, dict) else payload
+    if not isinstance(articles, list) or not articles:
+        raise RequestError(400, "Expected a non-empty 'articles' list")
+    if len(articles) > MAX_BATCH_ARTICLES:
+        raise RequestError(413, f"At most {MAX_BATCH_ARTICLES} articles per batch")
+    parsed = [_parse_article(article) for article in articles]
+
+    loop = asyncio.get_running_loop()
+    urls = sorted({url for _, url in parsed if url})
+    if urls:
+        sources_task = loop.run_in_executor(None, get_components().source_checker.check_many, urls)
+    # A batch is already large enough to score directly
+    results = await loop.run_in_executor(_analysis_executor, analyze_texts, [text for text, _ in parsed])
+    if urls:
+        sources = dict(zip(urls, await sources_task))
+        for result, (_, url) in zip(results, parsed):
+            if url:
+                result['source'] = sources[url]
+    return {'results': results}
+
+async def handle_health(payload):
+    return {'status': 'ok', 'batching': get_batcher().stats()}
+
+ROUTES = {
+    ('POST', '/analyze'): handle_analyze,
+    ('POST', '/analyze/batch'): handle_analyze_batch,
+    ('GET', '/health'): handle_health,
+}
+
+def _parse_article(article):
+    if isinstance(article, str):
+        article = {'text': article}
+    if not isinstance(article, dict):
+        raise RequestError(400, "Each article must be an object or a string")
+    text = article.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise RequestError(400, "Each article needs a non-empty 'text'")
+    url = article.get('url') or None
+    if url is not None and not isinstance(url, str):
+        raise RequestError(400, "'url' must be a string")
+    return text, url
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path'].rstrip('/') or '/'
+    handler = ROUTES.get((scope['method'], path))
+    try:
+        if handler is None:
+            if any(route_path == path for _, route_path in ROUTES):
+                raise RequestError(405, "Method not allowed")
+            raise RequestError(404, "Not found")
+        payload = None
+        if scope['method'] == 'POST':
+            payload = _decode_json(await _read_body(receive))
+        status, response = 200, await handler(payload)
+    except RequestError as e:
+        status, response = e.status, {'error': str(e)}
+    except Exception as e:
+        print(f"Error handling {scope['method']} {path}: {str(e)}")
+        status, response = 500, {'error': "Internal server error"}
+    await _send_json(send, status, response)
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                # Load the model before the first request arrives
+                await asyncio.get_running_loop().run_in_executor(_analysis_executor, warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+        elif message['type'] == 'lifespan.shutdown':
+            _analysis_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def _read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise RequestError(400, "Client disconnected")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestError(413, "Request body too large")
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+def _decode_json(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise RequestError(400, "Request body must be JSON")
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload, default=_json_default).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake News Detective JSON API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help="Server processes, each with its own model")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("The API server needs uvicorn (pip install uvicorn), or run api:app with another ASGI server")
+        sys.exit(1)
+    uvicorn.run('api:app', host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+from utils.analyzer import NewsAnalyzer
+from utils.batch import (
+    BatchRunner, JsonlResultWriter, ParquetResultWriter, iter_inputs, load_checkpoint
+)
+from utils.bulk_fetcher import BulkFetcher
+from utils.extraction_cache import ExtractionCache
+from utils.preprocessor import TextPreprocessor
+from utils.source_checker import SourceChecker
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze a corpus of articles offline and write one result per input"
+    )
+    parser.add_argument('input', help="JSONL or CSV file, .txt list of URLs, or a directory with one text/URL file per article")
+    parser.add_argument('output', help="JSONL file, or a directory of part files with --format parquet")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--url-field', default='url')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--check-sources', action='store_true',
+                        help="Also score the credibility of each input URL's domain")
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help="Inputs scored and checkpointed together")
+    parser.add_argument('--workers', type=int, help="Text cleaning processes (default: all cores)")
+    parser.add_argument('--fetch-workers', type=int, default=32, help="Concurrent URL downloads")
+    parser.add_argument('--per-host-limit', type=int, default=2, help="Concurrent downloads from one host")
+    parser.add_argument('--per-host-interval', type=float, default=1.0,
+                        help="Minimum seconds between requests to one host")
+    parser.add_argument('--retries', type=int, default=3, help="Attempts per URL for transient errors")
+    parser.add_argument('--ignore-robots', action='store_true', help="Do not check robots.txt")
+    parser.add_argument('--extraction-cache', metavar='PATH',
+                        help="SQLite file of articles extracted in earlier runs; URLs found there are not downloaded again")
+    parser.add_argument('--source-workers', type=int, help="Concurrent source checks")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or args.output.rstrip('/\\') + '.checkpoint.json'
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path)
+
+    if args.format == 'parquet':
+        writer = ParquetResultWriter(args.output, part=checkpoint['position'] if checkpoint else 0)
+    else:
+        if checkpoint:
+            JsonlResultWriter.truncate(args.output, checkpoint['position'])
+        elif os.path.exists(args.output):
+            os.remove(args.output)
+        writer = JsonlResultWriter(args.output)
+
+    extraction_cache = ExtractionCache(args.extraction_cache, url_ttl=None) if args.extraction_cache else None
+    bulk_fetcher = BulkFetcher(
+        max_concurrency=args.fetch_workers,
+        per_host_concurrency=args.per_host_limit,
+        per_host_interval=args.per_host_interval,
+        max_retries=args.retries,
+        respect_robots=not args.ignore_robots,
+        extraction_cache=extraction_cache
+    )
+    source_checker = SourceChecker() if args.check_sources else None
+    runner = BatchRunner(
+        TextPreprocessor(fast_mode=True, shared_stop_words=True),
+        NewsAnalyzer(),
+        source_checker=source_checker,
+        bulk_fetcher=bulk_fetcher,
+        batch_size=args.batch_size,
+        clean_workers=args.workers,
+        source_workers=args.source_workers
+    )
+
+    try:
+        records = iter_inputs(args.input, args.text_field, args.url_field, args.id_field)
+        checkpoint = runner.run(records, writer, checkpoint_path, checkpoint)
+        print(f"Finished: {checkpoint['processed']} inputs analyzed, results in {args.output}")
+    except KeyboardInterrupt:
+        print(f"Interrupted; run the same command again to resume from {checkpoint_path}")
+    finally:
+        writer.close()
+        bulk_fetcher.close()
+        if extraction_cache is not None:
+            extraction_cache.close()
+        if source_checker is not None:
+            source_checker.close()
+
+if __name__ == "__main__":
+    main()
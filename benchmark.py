@@ -0,0 +1,208 @@
+import argparse
+import pickle
+import random
+import time
+import tracemalloc
+import numpy as np
+from utils.analyzer import NewsAnalyzer
+from utils.preprocessor import TextPreprocessor
+
+# Sentences used to build synthetic articles of a realistic length
+SAMPLE_SENTENCES = [
+    "SHOCKING: Scientists discover miracle cure that big pharma doesn't want you to know!!!",
+    "You won't BELIEVE what this celebrity did next! Click to find out!",
+    "Secret society controls world economy - EXPOSED!!!",
+    "New study shows benefits of regular exercise on mental health",
+    "Local community center opens after renovation",
+    "Scientists publish findings on climate change impact",
+    "Recent economic report shows steady job growth",
+    "The city council approved the budget after a lengthy public hearing on Tuesday.",
+    "Officials said the investigation is ongoing and declined to comment further.",
+]
+
+def make_articles(count, sentences_per_article=40, seed=42):
+    """Build a reproducible list of synthetic articles"""
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(SAMPLE_SENTENCES) for _ in range(sentences_per_article))
+        for _ in range(count)
+    ]
+
+def make_random_corpus(count, vocabulary_size, words_per_document=300, seed=42):
+    """Documents drawn from a synthetic vocabulary, so vocabulary size is controllable"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [
+        ''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        for _ in range(vocabulary_size)
+    ]
+    return [
+        ' '.join(rng.choice(vocabulary) for _ in range(words_per_document))
+        for _ in range(count)
+    ]
+
+def report(label, elapsed, count):
+    """Print throughput for one benchmark run"""
+    print(f"{label:<28} {elapsed:8.3f}s  {count / elapsed:10.1f} docs/s")
+
+def benchmark_batch_scoring(count, batch_size):
+    """Compare per-article analyze_text calls with analyze_batch"""
+    analyzer = NewsAnalyzer()
+    articles = make_articles(count)
+    print(f"Scoring {count} articles (batch size {batch_size})")
+
+    start = time.perf_counter()
+    single_results = [analyzer.analyze_text(article) for article in articles]
+    report("analyze_text (per article)", time.perf_counter() - start, count)
+
+    start = time.perf_counter()
+    batch_results = []
+    for offset in range(0, count, batch_size):
+        batch_results.extend(analyzer.analyze_batch(articles[offset:offset + batch_size]))
+    report("analyze_batch", time.perf_counter() - start, count)
+
+    if [r['is_fake'] for r in single_results] != [r['is_fake'] for r in batch_results]:
+        print("Warning: batch verdicts differ from per-article verdicts")
+
+def benchmark_preprocessing(count):
+    """Compare the default clean_text path with fast mode"""
+    articles = make_articles(count)
+    default_preprocessor = TextPreprocessor()
+    fast_preprocessor = TextPreprocessor(fast_mode=True, shared_stop_words=True)
+    print(f"Cleaning {count} articles")
+
+    start = time.perf_counter()
+    default_output = [default_preprocessor.clean_text(article) for article in articles]
+    default_elapsed = time.perf_counter() - start
+    report("clean_text (default)", default_elapsed, count)
+
+    start = time.perf_counter()
+    fast_output = [fast_preprocessor.clean_text(article) for article in articles]
+    fast_elapsed = time.perf_counter() - start
+    report("clean_text (fast mode)", fast_elapsed, count)
+
+    print(f"Per-document: {default_elapsed / count * 1000:.3f}ms -> "
+          f"{fast_elapsed / count * 1000:.3f}ms ({default_elapsed / fast_elapsed:.1f}x speedup)")
+    print(f"Lemma cache: {TextPreprocessor.lemma_cache_info()}")
+    if default_output != fast_output:
+        print("Warning: fast mode output differs from the default path")
+
+def benchmark_vectorizers(count, vocabulary_size, n_features):
+    """Compare memory and latency of the TF-IDF vocabulary and the hashing backend"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from utils.hashing_model import StreamingIdf, make_hashing_vectorizer, tfidf_transform
+
+    corpus = make_random_corpus(count, vocabulary_size)
+    print(f"Fitting on {count} documents with a {vocabulary_size}-word vocabulary")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    tfidf = TfidfVectorizer().fit(corpus)
+    tfidf_fit = time.perf_counter() - start
+    tfidf_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tfidf_state = len(pickle.dumps(tfidf))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    hashing = make_hashing_vectorizer(n_features=n_features)
+    idf = StreamingIdf(n_features)
+    for offset in range(0, count, 1000):
+        idf.partial_fit(hashing.transform(corpus[offset:offset + 1000]))
+    weights = idf.idf
+    hashing_fit = time.perf_counter() - start
+    hashing_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    hashing_state = weights.nbytes
+
+    print(f"{'':<10} {'fit':>9} {'peak fit memory':>16} {'saved state':>13}")
+    print(f"{'tfidf':<10} {tfidf_fit:8.3f}s {tfidf_peak / 2**20:14.1f}MB {tfidf_state / 2**20:11.1f}MB")
+    print(f"{'hashing':<10} {hashing_fit:8.3f}s {hashing_peak / 2**20:14.1f}MB {hashing_state / 2**20:11.1f}MB")
+
+    sample = corpus[:1000]
+    start = time.perf_counter()
+    tfidf.transform(sample)
+    report("tfidf transform", time.perf_counter() - start, len(sample))
+    start = time.perf_counter()
+    tfidf_transform(hashing.transform(sample), weights)
+    report("hashing transform", time.perf_counter() - start, len(sample))
+
+def benchmark_persistence(count, database_url=None):
+    """Compare per-row add_entry with add_entries_bulk, on a throwaway SQLite file by default"""
+    import shutil
+    import tempfile
+    from utils import database
+
+    directory = None
+    if database_url is None:
+        directory = tempfile.mkdtemp(prefix='fake_news_db_')
+        database_url = f"sqlite:///{directory}/benchmark.db"
+    database.configure(database_url)
+    database.ArticleHistory.create_table()
+
+    articles = make_articles(count, sentences_per_article=10)
+    entries = [
+        {
+            'title': article[:100],
+            'content': article,
+            'url': f"https://example.com/articles/{i}",
+            'is_fake': i % 2 == 0,
+            'confidence_score': 75.0,
+            'source_credibility_score': 60.0,
+        }
+        for i, article in enumerate(articles)
+    ]
+    single_count = min(count // 2, 1000)
+    print(f"Saving {single_count} entries one by one and {count - single_count} in bulk to {database_url}")
+
+    session = database.SessionLocal()
+    try:
+        start = time.perf_counter()
+        for entry in entries[:single_count]:
+            database.ArticleHistory.add_entry(session, **entry)
+        report("add_entry (per row)", time.perf_counter() - start, single_count)
+
+        start = time.perf_counter()
+        result = database.ArticleHistory.add_entries_bulk(session, entries[single_count:])
+        report("add_entries_bulk", time.perf_counter() - start, count - single_count)
+        if result['errors']:
+            print(f"Warning: {len(result['errors'])} bulk rows failed")
+    finally:
+        session.close()
+        database.engine.dispose()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake News Detective performance benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scoring = subparsers.add_parser('scoring', help="Per-article vs batch scoring throughput")
+    scoring.add_argument('--count', type=int, default=5000)
+    scoring.add_argument('--batch-size', type=int, default=1000)
+
+    preprocessing = subparsers.add_parser('preprocessing', help="Default vs fast-mode text cleaning")
+    preprocessing.add_argument('--count', type=int, default=1000)
+
+    vectorizers = subparsers.add_parser('vectorizers', help="TF-IDF vocabulary vs hashing memory and latency")
+    vectorizers.add_argument('--count', type=int, default=5000)
+    vectorizers.add_argument('--vocabulary-size', type=int, default=200000)
+    vectorizers.add_argument('--n-features', type=int, default=2 ** 20)
+
+    persistence = subparsers.add_parser('persistence', help="Per-row vs bulk history inserts")
+    persistence.add_argument('--count', type=int, default=20000)
+    persistence.add_argument('--database-url',
+                             help="Database to write benchmark rows to (default: a temporary SQLite file)")
+
+    args = parser.parse_args()
+    if args.command == 'scoring':
+        benchmark_batch_scoring(args.count, args.batch_size)
+    elif args.command == 'preprocessing':
+        benchmark_preprocessing(args.count)
+    elif args.command == 'vectorizers':
+        benchmark_vectorizers(args.count, args.vocabulary_size, args.n_features)
+    elif args.command == 'persistence':
+        benchmark_persistence(args.count, args.database_url)
+
+if __name__ == "__main__":
+    main()
@@ -8,54 +8,54 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-from utils.preprocessor import TextPreprocessor
-from utils.analyzer import NewsAnalyzer
-from utils.source_checker import SourceChecker
+from utils.registry import get_components
 from utils.database import SessionLocal, ArticleHistory
+from utils.extractor import extract_article
 import plotly.graph_objects as go
-import trafilatura
-import requests
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
 from datetime import datetime
 
-def get_website_text_content(url: str) -> str:
-    """Extract text content from a website URL with improved error handling"""
+HISTORY_PAGE_SIZE = 50
+
+def fetch_article(url: str):
+    """Download a URL once and extract its article, returning (page, article)
+
+    article is a dict with 'text', 'title' and 'truncated'; its text starts
+    with "Error" when no article text is available. page is None if the
+    download failed or the article came straight from the extraction cache.
+    """
     try:
         parsed_url = urlparse(url)
         if not all([parsed_url.scheme, parsed_url.netloc]):
-            return "Error: Invalid URL format. Please enter a complete URL (e.g., https://example.com)"
+            return None, _fetch_error("Invalid URL format. Please enter a complete URL (e.g., https://example.com)")
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        downloaded = response.text
+        # Streamlit reruns the script on every interaction; recently fetched URLs skip the network
+        article = extraction_cache.get_by_url(url) if extraction_cache else None
+        if article is not None:
+            return None, article
 
-        text = trafilatura.extract(downloaded, include_comments=False, no_fallback=False)
-        if text and len(text.strip()) > 100:
-            return text
+        page = page_fetcher.fetch(url)
+        article = extraction_cache.get(url, page.body) if extraction_cache else None
+        if article is None:
+            extracted = extract_article(page.text)
+            if not extracted:
+                return page, _fetch_error("Could not extract meaningful content. Please paste the article text directly.")
+            article = dict(extracted, truncated=page.truncated)
+            # A cut-off download may succeed in full next time, so only complete pages are cached
+            if extraction_cache and not page.truncated:
+                extraction_cache.set(url, page.body, article)
+        return page, article
 
-        soup = BeautifulSoup(downloaded, 'html.parser')
-        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-            element.decompose()
-
-        for selector in ['article', 'main', '.article-body', '.story-body']:
-            content = soup.select_one(selector)
-            if content:
-                paragraphs = content.find_all('p')
-                text = '\n'.join(p.get_text().strip() for p in paragraphs)
-                if len(text.strip()) > 100:
-                    return text
+    except Exception as e:
+        return None, _fetch_error(str(e))
 
-        return "Error: Could not extract meaningful content. Please paste the article text directly."
+def _fetch_error(message):
+    return {'text': f"Error: {message}", 'title': None, 'truncated': None}
 
-    except Exception as e:
-        return f"Error: {str(e)}"
+def get_website_text_content(url: str) -> str:
+    """Extract text content from a website URL with improved error handling"""
+    return fetch_article(url)[1]['text']
 
 def create_gauge_chart(confidence, is_fake):
     color = 'red' if is_fake else 'green'
@@ -114,6 +114,7 @@ def main():
         
         input_method = st.radio("Choose input method:", ["Enter URL", "Paste Text"])
         article_text = ""
+        article_title = None
         source_credibility = None
         url = ""
         
@@ -121,16 +122,20 @@ def main():
             url = st.text_input("Enter article URL:")
             if url:
                 with st.spinner("Fetching article..."):
-                    article_text = get_website_text_content(url)
+                    page, article = fetch_article(url)
+                    article_text = article['text']
                     if article_text.startswith("Error"):
                         st.error(article_text)
                         article_text = ""
                     else:
                         st.success("Article fetched successfully!")
+                        article_title = article['title']
+                        if article['truncated']:
+                            st.info("This page is very large; only its first part was analyzed.")
                         with st.expander("View extracted text"):
                             st.text(article_text)
                             
-                        source_credibility = source_checker.check_source_credibility(url)
+                        source_credibility = source_checker.check_source_credibility(url, page=page)
         else:
             article_text = st.text_area("Paste your article text here:", height=200)
         
@@ -138,25 +143,20 @@ def main():
             if article_text:
                 try:
                     with st.spinner("Analyzing..."):
-                        # Process and analyze text
-                        cleaned_text = preprocessor.clean_text(article_text)
-                        results = analyzer.analyze_text(cleaned_text)
+                        # Process and analyze text, reusing earlier results for the same content
+                        results = analysis_cache.analyze(article_text, preprocessor, analyzer)
                         
-                        # Save to history
-                        db = SessionLocal()
-                        try:
-                            title = article_text.split('\n')[0][:100]
-                            ArticleHistory.add_entry(
-                                session=db,
-                                title=title,
-                                content=article_text[:1000],
-                                url=url,
-                                is_fake=results['is_fake'],
-                                confidence_score=results['confidence'],
-                                source_credibility_score=source_credibility['credibility_score'] if source_credibility else None
-                            )
-                        finally:
-                            db.close()
+                        # Save to history in the background so the results render right away
+                        if history_writer is not None:
+                            history_writer.submit({
+                                'title': (article_title or article_text.split('\n')[0])[:100],
+                                'content': article_text[:1000],
+                                'url': url,
+                                'is_fake': results['is_fake'],
+                                'confidence_score': results['confidence'],
+                                'source_credibility_score': source_credibility['credibility_score'] if source_credibility else None,
+                                'content_hash': results['content_hash']
+                            })
                         
                         # Display results
                         st.header("Analysis Results")
@@ -184,13 +184,41 @@ def main():
     
     with tab2:
         st.header("📋 Analysis History")
+        filter_cols = st.columns(3)
+        with filter_cols[0]:
+            verdict_filter = st.selectbox("Verdict", ["All", "Fake", "Genuine"])
+        with filter_cols[1]:
+            date_range = st.date_input("Date range", value=())
+        with filter_cols[2]:
+            domain_filter = st.text_input("Domain", placeholder="e.g. reuters.com")
+        
+        filters = {
+            'is_fake': {"All": None, "Fake": True, "Genuine": False}[verdict_filter],
+            'start_date': date_range[0] if len(date_range) > 0 else None,
+            'end_date': date_range[1] if len(date_range) > 1 else None,
+            'domain': domain_filter.strip() or None
+        }
+        # Changing a filter starts again from the first page
+        if st.session_state.get('history_filters') != filters:
+            st.session_state.history_filters = filters
+            # Cursor that starts each page visited so far; the last one is shown
+            st.session_state.history_cursors = [None]
+        
         db = SessionLocal()
         try:
-            history = ArticleHistory.get_history(db)
+            # Only the current page is queried on each rerun, starting from its
+            # saved cursor, so paging deeper costs the same as the first page
+            cursors = st.session_state.history_cursors
+            history, cursor = ArticleHistory.get_history_page(db, limit=HISTORY_PAGE_SIZE, before=cursors[-1], **filters)
+            
             if not history:
-                st.info("No analysis history yet. Start analyzing articles to see them here!")
+                if any(value is not None for value in filters.values()):
+                    st.info("No entries match these filters.")
+                else:
+                    st.info("No analysis history yet. Start analyzing articles to see them here!")
             else:
-                for idx, entry in enumerate(history):
+                st.caption("Sorted by first analysis; articles analyzed again keep their place.")
+                for entry in history:
                     with st.expander(f"{entry.title} - {entry.analysis_date.strftime('%Y-%m-%d %H:%M')}"):
                         col1, col2 = st.columns([1, 2])
                         with col1:
@@ -200,14 +228,29 @@ def main():
                                 st.write(f"**Source Credibility:** {entry.source_credibility_score:.1f}%")
                             if entry.url:
                                 st.write(f"**Source:** {entry.url}")
+                            if entry.submission_count and entry.submission_count > 1:
+                                last_submitted = entry.last_submitted_at or entry.analysis_date
+                                st.write(f"**Submitted:** {entry.submission_count} times, "
+                                         f"last on {last_submitted.strftime('%Y-%m-%d %H:%M')}")
                         with col2:
                             st.write("**Content:**")
                             st.text_area("", 
                                 value=entry.content,
                                 height=200,
                                 disabled=True,
-                                key=f"history_content_{idx}"
+                                key=f"history_content_{entry.id}"
                             )
+                
+                st.caption(f"Page {len(cursors)}")
+                col_newer, col_older = st.columns(2)
+                with col_newer:
+                    if len(cursors) > 1 and st.button("← Newer"):
+                        cursors.pop()
+                        st.rerun()
+                with col_older:
+                    if cursor is not None and st.button("Older →"):
+                        cursors.append(cursor)
+                        st.rerun()
         finally:
             db.close()
     
@@ -279,11 +322,16 @@ def main():
         """)
 
 if __name__ == "__main__":
-    # Initialize components
+    # Shared components are built once per server process, not on every rerun
     try:
-        preprocessor = TextPreprocessor()
-        analyzer = NewsAnalyzer()
-        source_checker = SourceChecker()
+        components = get_components()
+        preprocessor = components.preprocessor
+        analyzer = components.analyzer
+        source_checker = components.source_checker
+        page_fetcher = components.page_fetcher
+        analysis_cache = components.analysis_cache
+        history_writer = components.history_writer
+        extraction_cache = components.extraction_cache
     except Exception as e:
         st.error(f"Error initializing components: {str(e)}")
         st.stop()
@@ -3,6 +3,7 @@ import sys
 from pathlib import Path
 import streamlit.web.bootstrap as bootstrap
 from init_app import initialize_app
+from utils.registry import warm_up
 
 def main():
     """
@@ -33,6 +34,14 @@ def main():
         print("Failed to initialize application")
         sys.exit(1)
     
+    # Load the model and NLP resources before accepting traffic
+    print("Warming up analysis components...")
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"Failed to warm up components: {str(e)}")
+        sys.exit(1)
+    
     print("Starting Streamlit server...")
     try:
         flag_options = {
@@ -0,0 +1,25 @@
+import pytest
+from utils.batch import ParquetResultWriter
+
+
+def test_parquet_writer_removes_parts_past_the_resumed_checkpoint(tmp_path):
+    pytest.importorskip('pyarrow')
+    for part in range(4):
+        (tmp_path / f'part-{part:05d}.parquet').write_bytes(b'old')
+    (tmp_path / 'notes.txt').write_text('kept')
+
+    ParquetResultWriter(str(tmp_path), part=2)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'notes.txt', 'part-00000.parquet', 'part-00001.parquet'
+    ]
+
+
+def test_fresh_parquet_run_starts_with_no_parts(tmp_path):
+    pytest.importorskip('pyarrow')
+    (tmp_path / 'part-00000.parquet').write_bytes(b'old')
+
+    writer = ParquetResultWriter(str(tmp_path))
+    writer.write([{'id': 1, 'is_fake': False}])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['part-00000.parquet']
@@ -0,0 +1,43 @@
+import threading
+import time
+from utils.bulk_fetcher import BulkFetcher
+
+
+class _StubFetcher(BulkFetcher):
+    """BulkFetcher whose downloads are simulated, recording peak concurrency"""
+
+    def __init__(self, **kwargs):
+        super().__init__(respect_robots=False, **kwargs)
+        self.running = 0
+        self.peak = 0
+        self._count_lock = threading.Lock()
+
+    def _attempt(self, url):
+        with self._count_lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.01)
+        with self._count_lock:
+            self.running -= 1
+        return {'page': None, 'text': url, 'title': None, 'error': None}, None
+
+
+def test_more_hosts_than_workers():
+    fetcher = _StubFetcher(max_concurrency=2, per_host_interval=0.05)
+    urls = [f"https://h{host}.com/{page}" for host in range(5) for page in range(3)]
+    try:
+        results = fetcher.fetch_all(urls)
+    finally:
+        fetcher.close()
+
+    assert [result['text'] for result in results] == urls
+    assert all(result['error'] is None for result in results)
+    assert fetcher.peak <= 2
+
+
+def test_default_page_fetcher_keeps_no_bodies():
+    fetcher = BulkFetcher()
+    try:
+        assert fetcher.page_fetcher.cache.maxsize == 0
+    finally:
+        fetcher.close()
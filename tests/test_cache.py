@@ -0,0 +1,83 @@
+import time
+from utils.cache import TTLCache, SQLiteCacheStore
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = TTLCache(maxsize=10, max_bytes=10)
+    cache.set('a', b'xxxx')
+    cache.set('b', b'xxxx')
+    cache.get('a')
+    cache.set('c', b'xxxx')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'xxxx'
+    assert cache.get('c') == b'xxxx'
+    assert cache.stats()['bytes'] == 8
+
+
+def test_byte_budget_skips_oversized_values_and_tracks_replacements():
+    cache = TTLCache(maxsize=10, max_bytes=10)
+    cache.set('a', b'xxxx')
+    cache.set('a', b'xx')
+    cache.set('huge', b'x' * 11)
+
+    assert cache.get('huge') is None
+    assert cache.stats()['bytes'] == 2
+    cache.delete('a')
+    assert cache.stats()['bytes'] == 0
+
+
+def test_zero_maxsize_keeps_nothing():
+    cache = TTLCache(maxsize=0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=600)
+
+    now[0] += 61
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_maxsize_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_store_keeps_entries_across_instances(tmp_path):
+    store = SQLiteCacheStore(tmp_path / 'cache.db')
+    TTLCache(ttl=60, store=store, namespace='whois').set('example.com', 12)
+    store.close()
+
+    store = SQLiteCacheStore(tmp_path / 'cache.db')
+    try:
+        assert TTLCache(store=store, namespace='whois').get('example.com') == 12
+        assert TTLCache(store=store, namespace='tls').get('example.com') is None
+    finally:
+        store.close()
+
+
+def test_expired_store_entries_are_removed(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    store = SQLiteCacheStore(tmp_path / 'cache.db')
+    try:
+        TTLCache(ttl=60, store=store).set('a', {'has_ssl': True})
+        now[0] += 61
+        assert TTLCache(store=store).get('a') is None
+        assert store.get('default', 'a') is None
+    finally:
+        store.close()
@@ -0,0 +1,179 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from utils import database
+from utils.database import ArticleHistory
+
+# Set TEST_DATABASE_URL to a scratch Postgres database to run these tests there too;
+# its article_history table is emptied by every test
+BACKENDS = ['sqlite'] + (['postgresql'] if os.getenv('TEST_DATABASE_URL') else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def session(request, tmp_path):
+    if request.param == 'sqlite':
+        url = f"sqlite:///{tmp_path / 'history.db'}"
+    else:
+        url = os.environ['TEST_DATABASE_URL']
+    database.configure(url)
+    ArticleHistory.create_table()
+    session = database.SessionLocal()
+    session.execute(text("DELETE FROM article_history"))
+    session.commit()
+    yield session
+    session.close()
+    database.engine.dispose()
+
+
+def make_entry(content, **overrides):
+    entry = {
+        'title': content[:20],
+        'content': content,
+        'url': 'https://example.com/story',
+        'is_fake': False,
+        'confidence_score': 50.0,
+        'source_credibility_score': None,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def test_bulk_insert_returns_ids_in_input_order(session):
+    entries = [make_entry(f"article {i % 7}") for i in range(20)]
+    result = ArticleHistory.add_entries_bulk(session, entries, chunk_size=4)
+
+    assert result['errors'] == []
+    rows = {row.content: row for row in session.query(ArticleHistory)}
+    assert len(rows) == 7
+    for entry, entry_id in zip(entries, result['ids']):
+        assert rows[entry['content']].id == entry_id
+    assert rows['article 0'].submission_count == 3
+    assert rows['article 6'].submission_count == 2
+
+
+def test_bulk_insert_counts_repeats_of_stored_content(session):
+    first = ArticleHistory.add_entries_bulk(session, [make_entry("same story")])
+    second = ArticleHistory.add_entries_bulk(session, [make_entry("same story"), make_entry("other story")])
+
+    assert second['ids'][0] == first['ids'][0]
+    row = session.get(ArticleHistory, first['ids'][0])
+    session.refresh(row)
+    assert row.submission_count == 2
+
+
+def test_bulk_insert_reports_invalid_rows(session):
+    entries = [make_entry("good story"), make_entry("bad story", confidence_score="not a number")]
+    result = ArticleHistory.add_entries_bulk(session, entries)
+
+    assert result['ids'][0] is not None
+    assert result['ids'][1] is None
+    assert [error['index'] for error in result['errors']] == [1]
+
+
+def test_bulk_insert_rejects_zero_retries(session):
+    with pytest.raises(ValueError):
+        ArticleHistory.add_entries_bulk(session, [make_entry("story")], max_retries=0)
+
+
+def test_bulk_insert_reports_connection_errors_without_waiting(session, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise OperationalError("INSERT", {}, Exception("server closed the connection"))
+    monkeypatch.setattr(session, 'execute', unreachable)
+    monkeypatch.setattr(time, 'sleep', lambda seconds: pytest.fail("add_entries_bulk slept"))
+
+    result = ArticleHistory.add_entries_bulk(session, [make_entry("one"), make_entry("two")])
+
+    assert result['ids'] == [None, None]
+    assert all(error['retryable'] for error in result['errors'])
+
+
+def test_repeat_submission_keeps_its_history_position(session):
+    start = datetime(2024, 1, 1)
+    ArticleHistory.add_entries_bulk(session, [
+        make_entry("older story", analysis_date=start),
+        make_entry("newer story", analysis_date=start + timedelta(hours=1)),
+    ])
+    ArticleHistory.add_entries_bulk(session, [make_entry("older story", analysis_date=start + timedelta(hours=2))])
+    session.expire_all()
+
+    entries, _ = ArticleHistory.get_history_page(session)
+
+    assert [entry.content for entry in entries] == ["newer story", "older story"]
+    assert entries[1].submission_count == 2
+    assert entries[1].last_submitted_at == start + timedelta(hours=2)
+
+
+def test_keyset_pages_cover_history_once_newest_first(session):
+    start = datetime(2024, 1, 1)
+    ArticleHistory.add_entries_bulk(session, [
+        make_entry(f"story {i}", analysis_date=start + timedelta(hours=i)) for i in range(7)
+    ])
+
+    pages = []
+    cursor = None
+    while True:
+        entries, cursor = ArticleHistory.get_history_page(session, limit=3, before=cursor)
+        pages.append([entry.content for entry in entries])
+        if cursor is None:
+            break
+
+    assert pages == [["story 6", "story 5", "story 4"], ["story 3", "story 2", "story 1"], ["story 0"]]
+
+
+def test_history_filters(session):
+    start = datetime(2024, 1, 1, 12)
+    ArticleHistory.add_entries_bulk(session, [
+        make_entry("a", url="https://www.example.com/a", is_fake=True, analysis_date=start),
+        make_entry("b", url="http://example.com/b", analysis_date=start + timedelta(days=1)),
+        make_entry("c", url="https://example.com.evil.net/c", is_fake=True, analysis_date=start + timedelta(days=2)),
+        make_entry("d", url="https://other.org/d", analysis_date=start + timedelta(days=3)),
+    ])
+
+    def contents(**filters):
+        entries, _ = ArticleHistory.get_history_page(session, **filters)
+        return [entry.content for entry in entries]
+
+    assert contents(is_fake=True) == ["c", "a"]
+    assert contents(domain="example.com") == ["b", "a"]
+    assert contents(domain="https://www.example.com/some/path") == ["b", "a"]
+    # A date as end_date includes that whole day
+    assert contents(start_date=start + timedelta(days=1), end_date=(start + timedelta(days=2)).date()) == ["c", "b"]
+    assert contents(is_fake=False, domain="other.org") == ["d"]
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_POOL_TIMEOUT', '2.5')
+
+    options = database.engine_options_from_env()
+
+    assert options['pool_size'] == 3
+    assert options['pool_timeout'] == 2.5
+    assert options['max_overflow'] == 10
+
+
+def test_sqlite_file_engine_uses_wal(tmp_path):
+    engine = database.build_engine(f"sqlite:///{tmp_path / 'wal.db'}", pool_size=2)
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert engine.pool.size() == 2
+    finally:
+        engine.dispose()
+
+
+def test_configure_rebinds_sessions_to_in_memory_sqlite():
+    try:
+        database.configure('sqlite://')
+        ArticleHistory.create_table()
+        session = database.SessionLocal()
+        try:
+            result = ArticleHistory.add_entries_bulk(session, [make_entry("in memory")])
+            assert session.get(ArticleHistory, result['ids'][0]).content == "in memory"
+        finally:
+            session.close()
+    finally:
+        database.engine.dispose()
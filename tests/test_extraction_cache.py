@@ -0,0 +1,74 @@
+import time
+import pytest
+from utils.extraction_cache import ExtractionCache, normalize_url
+
+ARTICLE = {'text': "Body of the article", 'title': "Headline"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(tmp_path / 'extraction.db')
+    yield cache
+    cache.close()
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://News.Example.com:443/story?b=2&utm_source=x&a=1&fbclid=y#top") == \
+        "https://news.example.com/story?a=1&b=2"
+    assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+def test_lookup_by_url_and_by_body(cache):
+    cache.set("https://example.com/story?utm_medium=social", b"<html>v1</html>", ARTICLE)
+
+    assert cache.get_by_url("https://example.com/story") == ARTICLE
+    assert cache.get("https://mirror.example.net/story", b"<html>v1</html>") == ARTICLE
+    assert cache.get("https://example.com/story", b"<html>v2</html>") is None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = ExtractionCache(tmp_path / 'extraction.db')
+    cache.set("https://example.com/story", b"<html>v1</html>", ARTICLE)
+    cache.close()
+
+    cache = ExtractionCache(tmp_path / 'extraction.db')
+    try:
+        assert cache.get_by_url("https://example.com/story") == ARTICLE
+        assert cache.stats()['entries'] == 1
+    finally:
+        cache.close()
+
+
+def test_url_pointer_expires_but_body_entry_remains(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    cache = ExtractionCache(tmp_path / 'extraction.db', url_ttl=60, memory_size=0)
+    try:
+        cache.set("https://example.com/story", b"<html>v1</html>", ARTICLE)
+        now[0] += 61
+        assert cache.get_by_url("https://example.com/story") is None
+        assert cache.get("https://example.com/story", b"<html>v1</html>") == ARTICLE
+        assert cache.get_by_url("https://example.com/story") == ARTICLE
+    finally:
+        cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    cache = ExtractionCache(tmp_path / 'extraction.db', max_bytes=300, memory_size=0, compression_level=0)
+    try:
+        for i in range(3):
+            now[0] += 1
+            cache.set(f"https://example.com/{i}", f"<html>{i}</html>".encode(), {'text': 'x' * 60, 'title': str(i)})
+        now[0] += 1
+        cache.get_by_url("https://example.com/0")
+        now[0] += 1
+        cache.set("https://example.com/3", b"<html>3</html>", {'text': 'x' * 60, 'title': '3'})
+
+        assert cache.get_by_url("https://example.com/1") is None
+        assert cache.get_by_url("https://example.com/0") is not None
+        assert cache.get_by_url("https://example.com/3") is not None
+        assert cache.stats()['bytes'] <= 300
+    finally:
+        cache.close()
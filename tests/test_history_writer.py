@@ -0,0 +1,76 @@
+import json
+import os
+import pytest
+from sqlalchemy.exc import OperationalError
+from utils import database
+from utils.database import ArticleHistory
+from utils.history_writer import HistoryWriter
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    database.configure(f"sqlite:///{tmp_path / 'history.db'}")
+    ArticleHistory.create_table()
+    yield database.SessionLocal
+    database.engine.dispose()
+
+
+def make_record(content):
+    return {
+        'title': content,
+        'content': content,
+        'url': 'https://example.com/story',
+        'is_fake': True,
+        'confidence_score': 80.0,
+        'source_credibility_score': 40.0,
+    }
+
+
+def stored_counts(session_factory):
+    session = session_factory()
+    try:
+        return {row.content: row.submission_count for row in session.query(ArticleHistory)}
+    finally:
+        session.close()
+
+
+def test_unwritable_records_are_spilled_and_replayed(session_factory, tmp_path):
+    spill_path = str(tmp_path / 'spill.jsonl')
+
+    def unreachable():
+        raise OperationalError("connect", {}, Exception("connection refused"))
+
+    writer = HistoryWriter(unreachable, flush_interval=0.01, spill_path=spill_path,
+                           max_attempts=2, retry_base_delay=0.01, retry_max_delay=0.01)
+    writer.submit(make_record("first"))
+    writer.submit(make_record("second"))
+    writer.flush()
+    writer.close()
+    with open(spill_path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+
+    writer = HistoryWriter(session_factory, flush_interval=0.01, spill_path=spill_path, replay_interval=0)
+    writer.close()
+    assert writer.counters['replayed'] == 2
+    assert stored_counts(session_factory) == {'first': 1, 'second': 1}
+    assert not os.path.exists(spill_path)
+    assert not os.path.exists(spill_path + '.replay')
+
+
+def test_interrupted_replay_resumes_after_the_last_written_batch(session_factory, tmp_path):
+    spill_path = str(tmp_path / 'spill.jsonl')
+    replay_path = spill_path + '.replay'
+    lines = [json.dumps(make_record(f"record {i}")) + '\n' for i in range(4)]
+    with open(replay_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    # A replay with batch_size=2 stopped after writing its first batch
+    with open(replay_path + '.offset', 'w', encoding='utf-8') as f:
+        f.write(str(len(''.join(lines[:2]).encode('utf-8'))))
+
+    writer = HistoryWriter(session_factory, batch_size=2, flush_interval=0.01, spill_path=spill_path,
+                           replay_interval=0)
+    writer.close()
+
+    assert stored_counts(session_factory) == {'record 2': 1, 'record 3': 1}
+    assert not os.path.exists(replay_path)
+    assert not os.path.exists(replay_path + '.offset')
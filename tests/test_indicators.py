@@ -0,0 +1,63 @@
+from utils.indicators import Indicator, IndicatorEngine
+
+
+def test_default_indicators():
+    hits = IndicatorEngine().scan("Shocking! You won't believe it!! Really?")
+
+    assert hits['Emotional Language']['terms'] == {'shocking': 1}
+    assert hits['Clickbait Style']['present']
+    assert hits['Excessive Punctuation']['terms'] == {'!': 3, '?': 1}
+    assert hits['Excessive Punctuation']['present']
+
+
+def test_whole_word_terms_skip_longer_words():
+    hits = IndicatorEngine().scan("An amazingly incredible result")
+
+    assert hits['Emotional Language']['terms'] == {'incredible': 1}
+    assert hits['Emotional Language']['offsets'] == [(13, 23)]
+
+
+def test_longest_match_also_counts_the_terms_it_starts_with():
+    hits = IndicatorEngine().scan("The shocking truth")
+
+    assert hits['Clickbait Style']['terms'] == {'shocking truth': 1}
+    assert hits['Emotional Language']['terms'] == {'shocking': 1}
+    assert hits['Emotional Language']['offsets'] == [(4, 12)]
+
+
+def test_overlapping_terms_of_different_indicators():
+    engine = IndicatorEngine([
+        Indicator('Short', ['fake']),
+        Indicator('Long', ['fake news'], whole_word=False),
+        Indicator('Inner', ['news']),
+    ])
+    hits = engine.scan("Fake news, fakes and newsletters")
+
+    assert hits['Short']['count'] == 1
+    assert hits['Long']['count'] == 1
+    assert hits['Inner']['offsets'] == [(5, 9)]
+
+
+def test_thresholds():
+    engine = IndicatorEngine([
+        Indicator('Total', ['a', 'b'], threshold=3),
+        Indicator('Each', ['a', 'b'], threshold=3, per_term=True),
+    ])
+    hits = engine.scan("a b a b")
+
+    assert hits['Total']['present']
+    assert not hits['Each']['present']
+
+
+def test_register_replaces_an_indicator_with_the_same_name():
+    engine = IndicatorEngine()
+    engine.scan("warm up the compiled pattern")
+    engine.register(Indicator('Emotional Language', ['outrageous']))
+    hits = engine.scan("Outrageous and shocking")
+
+    assert [indicator.name for indicator in engine.indicators][-1] == 'Emotional Language'
+    assert hits['Emotional Language']['terms'] == {'outrageous': 1}
+
+
+def test_no_indicators():
+    assert IndicatorEngine([]).scan("anything") == {}
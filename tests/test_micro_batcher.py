@@ -0,0 +1,35 @@
+import asyncio
+from utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_items_are_batched_in_order():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+
+    assert results == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert batcher.stats()['batches'] == 3
+    assert not batcher._tasks
+
+
+def test_batch_errors_reach_every_caller():
+    def process(items):
+        raise RuntimeError("model unavailable")
+
+    async def main():
+        batcher = MicroBatcher(process, max_wait=0.001)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from utils.model_bundle import BundleScorer, save_bundle
+
+TRAINING_TEXTS = [
+    "Scientists publish peer reviewed study on climate data",
+    "Officials confirm the budget figures in a public report",
+    "Shocking secret cure doctors do not want you to know",
+    "You won't believe what this celebrity did next",
+    "The central bank held interest rates steady on Tuesday",
+    "Miracle pill melts fat overnight, experts stunned",
+]
+LABELS = [0, 0, 1, 1, 0, 1]
+
+
+@pytest.mark.parametrize('settings', [
+    {},
+    {'ngram_range': (1, 2), 'stop_words': 'english', 'sublinear_tf': True},
+    {'binary': True, 'norm': 'l1', 'use_idf': False},
+])
+def test_scorer_matches_sklearn(tmp_path, settings):
+    vectorizer = TfidfVectorizer(**settings)
+    model = LogisticRegression().fit(vectorizer.fit_transform(TRAINING_TEXTS), LABELS)
+    path = save_bundle(vectorizer, model, str(tmp_path / 'model.bundle'))
+
+    scorer = BundleScorer(path)
+    texts = TRAINING_TEXTS + ["Entirely unseen words here", "", "secret cure for the budget"]
+
+    expected = model.predict_proba(vectorizer.transform(texts))
+    np.testing.assert_allclose(scorer.predict_proba(texts), expected, rtol=1e-9, atol=1e-12)
+    assert scorer.classes == [0, 1]
+
+
+def test_rewriting_a_bundle_leaves_no_temporary_files(tmp_path):
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(TRAINING_TEXTS), LABELS)
+    path = str(tmp_path / 'model.bundle')
+    save_bundle(vectorizer, model, path)
+    save_bundle(vectorizer, model, path)
+
+    assert sorted(os.listdir(path)) == [
+        'coef.npy', 'idf.npy', 'intercept.npy', 'manifest.json', 'vocabulary.npy', 'vocabulary_index.npy'
+    ]
+
+
+def test_unsupported_vectorizer_is_rejected(tmp_path):
+    vectorizer = TfidfVectorizer(analyzer='char')
+    model = LogisticRegression().fit(vectorizer.fit_transform(TRAINING_TEXTS), LABELS)
+
+    with pytest.raises(ValueError):
+        save_bundle(vectorizer, model, str(tmp_path / 'model.bundle'))
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime
+from utils import source_checker
+from utils.source_checker import SourceChecker
+
+
+class _Record:
+    creation_date = datetime(2000, 1, 1)
+
+
+@pytest.fixture
+def checker(tmp_path, monkeypatch):
+    reputation_path = tmp_path / 'reputation.csv'
+    reputation_path.write_text("domain,reputation\nexample.org,credible\n", encoding='utf-8')
+    checker = SourceChecker(ssl_probe='head', reputation_path=str(reputation_path))
+    monkeypatch.setattr(checker, '_probe_head', lambda url: dict(source_checker._NO_TLS,
+                                                                 has_ssl=url.startswith('https://')))
+    yield checker
+    checker.close()
+
+
+def test_failed_whois_lookup_is_not_cached(checker, monkeypatch):
+    def unreachable(domain):
+        raise OSError("whois server unreachable")
+    monkeypatch.setattr(source_checker.whois, 'whois', unreachable)
+
+    result = checker.check_source_credibility('https://example.org/story')
+
+    assert result['factors']['domain_age'] == 0
+    assert checker.score_cache.get('https://example.org') is None
+
+    monkeypatch.setattr(source_checker.whois, 'whois', lambda domain: _Record)
+    result = checker.check_source_credibility('https://example.org/story')
+    assert result['factors']['domain_age'] > 5
+    assert checker.score_cache.get('https://example.org') is not None
+
+
+def test_scores_are_cached_per_scheme(checker, monkeypatch):
+    monkeypatch.setattr(source_checker.whois, 'whois', lambda domain: _Record)
+
+    secure = checker.check_source_credibility('https://example.org/story')
+    plain = checker.check_source_credibility('http://example.org/story')
+
+    assert secure['factors']['has_ssl']
+    assert not plain['factors']['has_ssl']
+    assert secure['factors']['is_known_credible'] and plain['factors']['is_known_credible']
@@ -1,9 +1,11 @@
+import argparse
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 import pickle
 import os
+from utils.model_bundle import save_bundle
 
 # Sample dataset for demonstration
 # In real application, this would be loaded from a proper dataset file
@@ -23,29 +25,165 @@ real_news = [
     "Recent economic report shows steady job growth"
 ]
 
-# Create labels (1 for fake, 0 for real)
-X = fake_news + real_news
-y = np.array([1] * len(fake_news) + [0] * len(real_news))
+def save_tfidf_model(vectorizer, model):
+    """Save a fitted TF-IDF vectorizer and classifier as a pickle and a model bundle"""
+    # Create a dictionary containing both the model and vectorizer
+    model_components = {
+        'model': model,
+        'vectorizer': vectorizer
+    }
 
-# Create models directory if it doesn't exist
-os.makedirs('models', exist_ok=True)
+    # Save the model and vectorizer
+    with open('models/fake_news_model.pkl', 'wb') as f:
+        pickle.dump(model_components, f)
 
-# Initialize TfidfVectorizer and transform the text data
-vectorizer = TfidfVectorizer(max_features=5000)
-X_vectorized = vectorizer.fit_transform(X)
+    # Export the memory-mappable bundle used by the lean scorer
+    save_bundle(vectorizer, model, 'models/fake_news_model.bundle')
 
-# Train the model
-model = LogisticRegression(random_state=42)
-model.fit(X_vectorized, y)
+def train_tfidf(X, y):
+    """Train the TF-IDF model and save it as a pickle and a model bundle"""
+    # Initialize TfidfVectorizer and transform the text data
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X_vectorized = vectorizer.fit_transform(X)
 
-# Create a dictionary containing both the model and vectorizer
-model_components = {
-    'model': model,
-    'vectorizer': vectorizer
-}
+    # Train the model
+    model = LogisticRegression(random_state=42)
+    model.fit(X_vectorized, y)
 
-# Save the model and vectorizer
-with open('models/fake_news_model.pkl', 'wb') as f:
-    pickle.dump(model_components, f)
+    save_tfidf_model(vectorizer, model)
 
-print("Model trained and saved successfully!")
+def train_hashing(X, y, n_features, chunk_size=10000):
+    """Train on hashed features with streaming IDF; no vocabulary is built or saved"""
+    # Imported here so the default mode does not depend on it
+    from utils.hashing_model import (
+        StreamingIdf, make_hashing_vectorizer, save_hashing_bundle, tfidf_transform
+    )
+
+    vectorizer = make_hashing_vectorizer(n_features=n_features)
+
+    # Document frequencies are accumulated chunk by chunk
+    idf = StreamingIdf(n_features)
+    for start in range(0, len(X), chunk_size):
+        idf.partial_fit(vectorizer.transform(X[start:start + chunk_size]))
+
+    X_vectorized = tfidf_transform(vectorizer.transform(X), idf.idf)
+    model = LogisticRegression(random_state=42)
+    model.fit(X_vectorized, y)
+
+    save_hashing_bundle(vectorizer, idf.idf, model, 'models/fake_news_model.hashing.bundle')
+
+def train_streaming(args):
+    """Train out of core on labeled articles streamed from files or article_history"""
+    from utils.training import StreamingTrainer, iter_corpus
+
+    trainer = StreamingTrainer(
+        n_features=args.n_features,
+        chunk_size=args.chunk_size,
+        checkpoint_every=args.checkpoint_every,
+        single_pass=args.single_pass,
+        epochs=args.epochs
+    )
+    trainer.fit(lambda: iter_corpus(args.stream, args.text_field, args.label_field))
+
+def train_with_search(X, y, args):
+    """Cross-validate a hyperparameter search, save the best model and a metrics report"""
+    import json
+    import shutil
+    import tempfile
+    from sklearn.metrics import accuracy_score, f1_score
+    from utils.training import search_hyperparameters
+
+    # Hold out a test split that the search never sees
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, stratify=y, random_state=42
+    ) if args.test_size else (X, [], y, [])
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix='fake_news_cv_')
+    try:
+        search, report = search_hyperparameters(
+            X_train, y_train, folds=args.folds, n_iter=args.n_iter,
+            n_jobs=args.jobs, cache_dir=cache_dir
+        )
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    best = search.best_estimator_
+    if len(X_test):
+        predictions = best.predict(X_test)
+        report['holdout'] = {
+            'documents': len(X_test),
+            'accuracy': float(accuracy_score(y_test, predictions)),
+            'f1': float(f1_score(y_test, predictions)),
+        }
+
+    # The fitted pipeline has no cache attached, so its steps can be saved as usual
+    save_tfidf_model(best.named_steps['tfidf'], best.named_steps['clf'])
+    with open('models/fake_news_model.metrics.json', 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Best parameters: {report['best_params']} (cross-validated F1 {report['best_cv_f1']:.3f})")
+    print("Metrics report written to models/fake_news_model.metrics.json")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the fake news classifier")
+    parser.add_argument('--vectorizer', choices=['tfidf', 'hashing'], default='tfidf',
+                        help="tfidf: vocabulary-based model (default); hashing: fixed feature space")
+    parser.add_argument('--n-features', type=int, default=2 ** 20,
+                        help="Feature space size for the hashing vectorizer")
+
+    streaming = parser.add_argument_group("streaming training (always uses the hashing vectorizer)")
+    streaming.add_argument('--stream', nargs='+', metavar='SOURCE',
+                           help="JSONL/CSV files with text and label columns, or 'history' for article_history")
+    streaming.add_argument('--text-field', default='text')
+    streaming.add_argument('--label-field', default='label')
+    streaming.add_argument('--chunk-size', type=int, default=10000)
+    streaming.add_argument('--checkpoint-every', type=int, default=100000,
+                           help="Write a checkpoint bundle after this many documents")
+    streaming.add_argument('--epochs', type=int, default=1)
+    streaming.add_argument('--single-pass', action='store_true',
+                           help="Update IDF while fitting instead of in a separate first pass")
+
+    search = parser.add_argument_group("hyperparameter search (TF-IDF model)")
+    search.add_argument('--search', action='store_true',
+                        help="Run k-fold cross-validated search and keep the best model")
+    search.add_argument('--data', nargs='+', metavar='SOURCE',
+                        help="Labeled JSONL/CSV files or 'history' (default: the built-in sample)")
+    search.add_argument('--folds', type=int, default=5)
+    search.add_argument('--n-iter', type=int,
+                        help="Sample this many candidates at random instead of the full grid")
+    search.add_argument('--jobs', type=int, default=-1, help="Parallel workers (-1: all cores)")
+    search.add_argument('--test-size', type=float, default=0.0,
+                        help="Fraction held out from the search for a final evaluation")
+    search.add_argument('--cache-dir', help="Keep the vectorized-fold cache in this directory")
+    args = parser.parse_args()
+
+    if args.stream:
+        os.makedirs('models', exist_ok=True)
+        train_streaming(args)
+        print("Model trained and saved successfully!")
+        return
+
+    # Create labels (1 for fake, 0 for real)
+    X = fake_news + real_news
+    y = np.array([1] * len(fake_news) + [0] * len(real_news))
+    if args.data:
+        from utils.training import iter_corpus
+        pairs = list(iter_corpus(args.data, args.text_field, args.label_field))
+        X = [text for text, _ in pairs]
+        y = np.array([label for _, label in pairs])
+
+    # Create models directory if it doesn't exist
+    os.makedirs('models', exist_ok=True)
+
+    if args.search:
+        train_with_search(X, y, args)
+    elif args.vectorizer == 'hashing':
+        train_hashing(X, y, args.n_features)
+    else:
+        train_tfidf(X, y)
+
+    print("Model trained and saved successfully!")
+
+if __name__ == "__main__":
+    main()
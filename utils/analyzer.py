@@ -1,48 +1,50 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 import pickle
 import os
+from utils.indicators import IndicatorEngine
+from utils.model_bundle import load_scorer, bundle_exists, DEFAULT_BUNDLE_PATH, DEFAULT_HASHING_BUNDLE_PATH
 
 class NewsAnalyzer:
-    def __init__(self):
-        # Load pre-trained model and vectorizer
-        model_path = os.path.join('models', 'fake_news_model.pkl')
-        with open(model_path, 'rb') as f:
-            model_components = pickle.load(f)
-            self.model = model_components['model']
-            self.vectorizer = model_components['vectorizer']
+    def __init__(self, backend='auto', bundle_path=None):
+        # 'bundle' scores from the memory-mapped TF-IDF bundle, 'hashing' from a
+        # hashing-vectorizer bundle and 'pickle' from the pickled sklearn objects;
+        # 'auto' prefers the TF-IDF bundle when one exists
+        if backend == 'auto':
+            backend = 'bundle' if bundle_exists(bundle_path or DEFAULT_BUNDLE_PATH) else 'pickle'
+        if backend not in ('bundle', 'hashing', 'pickle'):
+            raise ValueError(f"Unknown analyzer backend: {backend}")
+        self.backend = backend
+        
+        if backend in ('bundle', 'hashing'):
+            default_path = DEFAULT_BUNDLE_PATH if backend == 'bundle' else DEFAULT_HASHING_BUNDLE_PATH
+            self.scorer = load_scorer(bundle_path or default_path)
+            # The manifest checksum changes with the model, so caches key on it
+            self.model_path = self.scorer.manifest_path
+        else:
+            # Load pre-trained model and vectorizer
+            model_path = os.path.join('models', 'fake_news_model.pkl')
+            self.model_path = model_path
+            with open(model_path, 'rb') as f:
+                model_components = pickle.load(f)
+                self.model = model_components['model']
+                self.vectorizer = model_components['vectorizer']
+        
+        # All indicator keywords and phrases are matched in one pass over the text
+        self.indicator_engine = IndicatorEngine()
     
     def get_credibility_indicators(self, text):
         # Extract features that might indicate fake news
-        indicators = {
-            'Emotional Language': self._check_emotional_language(text),
-            'Clickbait Style': self._check_clickbait(text),
-            'Excessive Punctuation': self._check_punctuation(text)
+        return {
+            name: hit['present']
+            for name, hit in self.indicator_engine.scan(text).items()
         }
-        return indicators
-    
-    def _check_emotional_language(self, text):
-        emotional_words = ['shocking', 'incredible', 'amazing', 'unbelievable']
-        count = sum(1 for word in text.lower().split() if word in emotional_words)
-        return count > 0
-    
-    def _check_clickbait(self, text):
-        clickbait_patterns = ['you won\'t believe', 'shocking truth', 'what happens next']
-        return any(pattern in text.lower() for pattern in clickbait_patterns)
-    
-    def _check_punctuation(self, text):
-        return text.count('!') > 2 or text.count('?') > 2
 
-    def analyze_text(self, text):
-        # Transform text using TF-IDF
-        text_vectorized = self.vectorizer.transform([text])
-        
-        # Get prediction probability
-        probability = self.model.predict_proba(text_vectorized)[0]
-        
-        # Get credibility indicators
-        indicators = self.get_credibility_indicators(text)
-        
+    def get_indicator_details(self, text):
+        """Hit counts and offsets for every credibility indicator"""
+        return self.indicator_engine.scan(text)
+
+    def _build_result(self, probability, indicators):
+        """Turn one row of class probabilities into an analysis result"""
         # Calculate confidence level
         confidence = max(probability) * 100
         
@@ -54,3 +56,36 @@ class NewsAnalyzer:
             'confidence': confidence,
             'indicators': indicators
         }
+
+    def _predict_proba(self, texts):
+        """Class probabilities for each text from the active backend"""
+        if self.backend != 'pickle':
+            return self.scorer.predict_proba(texts)
+        
+        # Transform text using TF-IDF
+        texts_vectorized = self.vectorizer.transform(texts)
+        return self.model.predict_proba(texts_vectorized)
+
+    def analyze_text(self, text):
+        # Get prediction probability
+        probability = self._predict_proba([text])[0]
+        
+        # Get credibility indicators
+        indicators = self.get_credibility_indicators(text)
+        
+        return self._build_result(probability, indicators)
+
+    def analyze_batch(self, texts):
+        """Analyze many texts at once and return the results in input order"""
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        # Score the whole batch in a single call
+        probabilities = self._predict_proba(texts)
+        
+        return [
+            self._build_result(probability, self.get_credibility_indicators(text))
+            for text, probability in zip(texts, probabilities)
+        ]
+
@@ -0,0 +1,243 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+_URL_PREFIXES = ('http://', 'https://')
+_PART_PATTERN = re.compile(r'part-(\d+)\.parquet')
+
+def iter_inputs(source, text_field='text', url_field='url', id_field='id'):
+    """Yield input records {'id', 'text', 'url'} from a JSONL, CSV or .txt file or a directory
+
+    A .txt file lists one URL per line. In a directory every file is one
+    input: its content is a URL when it is a single http(s) line and article
+    text otherwise. Files are read in sorted order so a resumed run sees the
+    same sequence.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, encoding='utf-8', errors='replace') as f:
+                content = f.read().strip()
+            if '\n' not in content and content.startswith(_URL_PREFIXES):
+                yield {'id': name, 'text': None, 'url': content}
+            else:
+                yield {'id': name, 'text': content, 'url': None}
+    elif source.endswith(('.jsonl', '.json')):
+        with open(source, encoding='utf-8') as f:
+            for number, line in enumerate(f):
+                if line.strip():
+                    yield _make_record(json.loads(line), number, text_field, url_field, id_field)
+    elif source.endswith('.txt'):
+        with open(source, encoding='utf-8') as f:
+            for number, line in enumerate(f):
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    yield {'id': number, 'text': None, 'url': url}
+    elif source.endswith('.csv'):
+        # Article bodies easily exceed the default field size limit
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        with open(source, encoding='utf-8', newline='') as f:
+            for number, row in enumerate(csv.DictReader(f)):
+                yield _make_record(row, number, text_field, url_field, id_field)
+    else:
+        raise ValueError(f"Unsupported input: {source} (expected .jsonl, .csv, .txt or a directory)")
+
+def _make_record(row, number, text_field, url_field, id_field):
+    record_id = row.get(id_field)
+    return {
+        'id': record_id if record_id not in (None, '') else number,
+        'text': row.get(text_field) or None,
+        'url': row.get(url_field) or None,
+    }
+
+
+class JsonlResultWriter:
+    """Append results to a JSON Lines file, one object per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def truncate(path, size):
+        """Drop anything written after the last checkpoint"""
+        if os.path.exists(path):
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+    def write(self, results):
+        for result in results:
+            self.file.write(json.dumps(result, default=str) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetResultWriter:
+    """Write each batch of results as a numbered part file in a Parquet dataset directory
+
+    Parts numbered from part on are deleted when the writer is created: they
+    come from an earlier run (part=0) or were written after the checkpoint
+    being resumed.
+    """
+
+    def __init__(self, path, part=0):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.part = part
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            match = _PART_PATTERN.fullmatch(name)
+            if match and int(match.group(1)) >= part:
+                os.remove(os.path.join(path, name))
+
+    def write(self, results):
+        # Nested values are stored as JSON so every part has the same flat schema
+        rows = [
+            {key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+             for key, value in result.items()}
+            for result in results
+        ]
+        table = self._pa.Table.from_pylist(rows)
+        self._pq.write_table(table, os.path.join(self.path, f'part-{self.part:05d}.parquet'))
+        self.part += 1
+        return self.part
+
+    def close(self):
+        pass
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_checkpoint(path, checkpoint):
+    # Written to a temporary file first so an interruption never leaves half a checkpoint
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+
+class BatchRunner:
+    """Stream input records through fetching, cleaning, scoring and source checks
+
+    Records are processed in batches of batch_size. After each batch the
+    results are flushed and a checkpoint records how many inputs are done,
+    so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, preprocessor, analyzer, source_checker=None, bulk_fetcher=None,
+                 batch_size=256, clean_workers=None, source_workers=None):
+        self.preprocessor = preprocessor
+        self.analyzer = analyzer
+        self.source_checker = source_checker
+        self.bulk_fetcher = bulk_fetcher
+        self.batch_size = batch_size
+        self.clean_workers = clean_workers
+        self.source_workers = source_workers
+
+    def run(self, records, writer, checkpoint_path, checkpoint=None):
+        """Process records, skipping those a previous checkpoint already covers"""
+        checkpoint = dict(checkpoint or {'processed': 0})
+        records = islice(records, checkpoint['processed'], None)
+        if checkpoint['processed']:
+            print(f"Resuming after {checkpoint['processed']} inputs")
+
+        start = time.perf_counter()
+        done = 0
+        for batch in _chunked(self._cleaned(self._fetched(records)), self.batch_size):
+            position = writer.write(self._analyze(batch))
+            done += len(batch)
+            checkpoint['processed'] += len(batch)
+            checkpoint['position'] = position
+            save_checkpoint(checkpoint_path, checkpoint)
+            elapsed = time.perf_counter() - start
+            print(f"{checkpoint['processed']} inputs done ({done / elapsed:.1f} docs/s)")
+        return checkpoint
+
+    def _fetched(self, records):
+        # The URL inputs of each batch are downloaded together by the bulk fetcher
+        for batch in _chunked(records, self.batch_size):
+            pending = [record for record in batch if record['url'] and not record['text']]
+            if not pending:
+                fetched = []
+            elif self.bulk_fetcher is None:
+                fetched = [{'text': None, 'error': "URL inputs need a bulk fetcher"} for _ in pending]
+            else:
+                fetched = self.bulk_fetcher.fetch_all([record['url'] for record in pending])
+            results = {id(record): result for record, result in zip(pending, fetched)}
+            for record in batch:
+                result = results.get(id(record))
+                if result is None:
+                    yield record
+                elif result['text']:
+                    yield dict(record, text=result['text'])
+                else:
+                    yield dict(record, error=result['error'])
+
+    def _cleaned(self, records):
+        # clean_iter keeps one process pool for the whole stream and yields in order
+        pending = deque()
+
+        def texts():
+            for record in records:
+                pending.append(record)
+                yield record['text'] or ''
+
+        for cleaned in self.preprocessor.clean_iter(texts(), workers=self.clean_workers):
+            yield pending.popleft(), cleaned
+
+    def _analyze(self, batch):
+        scorable = [(record, cleaned) for record, cleaned in batch
+                    if record['text'] and not record.get('error')]
+        analyses = self.analyzer.analyze_batch([cleaned for _, cleaned in scorable])
+        by_record = {id(record): analysis for (record, _), analysis in zip(scorable, analyses)}
+
+        sources = {}
+        if self.source_checker is not None:
+            urls = sorted({record['url'] for record, _ in batch if record['url']})
+            sources = dict(zip(urls, self.source_checker.check_many(urls, self.source_workers)))
+
+        results = []
+        for record, _ in batch:
+            result = {'id': record['id'], 'url': record['url']}
+            analysis = by_record.get(id(record))
+            if analysis is not None:
+                result.update(
+                    is_fake=bool(analysis['is_fake']),
+                    confidence=float(analysis['confidence']),
+                    indicators={name: bool(value) for name, value in analysis['indicators'].items()}
+                )
+            else:
+                result['error'] = record.get('error') or "No article text"
+            if record['url'] and self.source_checker is not None:
+                result['source'] = sources.get(record['url'])
+            results.append(result)
+        return results
@@ -0,0 +1,202 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import requests
+from utils.cache import TTLCache
+from utils.extractor import extract_article
+from utils.fetcher import PageFetcher
+
+# Responses worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class BulkFetcher:
+    """Fetch many URLs concurrently while staying polite to each host
+
+    At most max_concurrency downloads run at once, at most per_host_concurrency
+    against one host, and requests to a host start at least per_host_interval
+    seconds apart (longer if its robots.txt sets a Crawl-delay). Connection
+    errors, timeouts and 429/5xx responses are retried with jittered
+    exponential backoff; a retry waits in the host's queue rather than in a
+    worker thread. URLs disallowed by robots.txt are not fetched. With an
+    extraction_cache, recently extracted URLs are served without a download.
+    """
+
+    def __init__(self, page_fetcher=None, max_concurrency=32, per_host_concurrency=2, per_host_interval=1.0,
+                 max_retries=3, base_delay=0.5, max_delay=30.0, max_redirects=5, respect_robots=True,
+                 robots_agent='FakeNewsDetective', max_buffered=10000, extraction_cache=None):
+        # A crawl downloads each URL once, so keeping bodies for revalidation only costs memory
+        self.page_fetcher = page_fetcher or PageFetcher(pool_size=max_concurrency, cache_size=0)
+        self.page_fetcher.session.max_redirects = max_redirects
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_interval = per_host_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.respect_robots = respect_robots
+        self.robots_agent = robots_agent
+        self.extraction_cache = extraction_cache
+        # URLs read ahead of the downloads so busy hosts do not hold up the others
+        self.max_buffered = max_buffered
+        self._robots = TTLCache(maxsize=10000, ttl=3600)
+        self._robots_locks = defaultdict(threading.Lock)
+        self._robots_lock = threading.Lock()
+        self._crawl_delays = {}
+
+    def fetch_iter(self, urls):
+        """Fetch urls and yield a result for each as soon as it is done (not in input order)
+
+        Results are dicts with 'index' (position in urls), 'url', 'page',
+        'text' (extracted article text), 'title', 'error' and 'attempts'.
+        page is None for results served from the extraction cache.
+        """
+        source = enumerate(urls)
+        exhausted = False
+        queues = {}
+        host_ready = {}
+        active = defaultdict(int)
+        in_flight = {}
+        buffered = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='bulk-fetch') as executor:
+            while True:
+                while not exhausted and buffered < self.max_buffered:
+                    try:
+                        index, url = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    host = urlparse(url).netloc.lower()
+                    queues.setdefault(host, deque()).append((index, url, 1))
+                    buffered += 1
+
+                # Start every download whose host has a free slot and is past its interval
+                now = time.monotonic()
+                next_ready = None
+                for host in list(queues):
+                    queue = queues[host]
+                    while (queue and len(in_flight) < self.max_concurrency
+                           and active[host] < self.per_host_concurrency and host_ready.get(host, 0) <= now):
+                        item = queue.popleft()
+                        in_flight[executor.submit(self._attempt, item[1])] = (host, item)
+                        active[host] += 1
+                        host_ready[host] = now + max(self.per_host_interval, self._crawl_delays.get(host, 0))
+                    if not queue:
+                        del queues[host]
+                    elif active[host] < self.per_host_concurrency and host_ready.get(host, 0) > now:
+                        # Hosts not started yet have no entry; they wait for a free worker, not a time
+                        next_ready = host_ready[host] if next_ready is None else min(next_ready, host_ready[host])
+
+                if not in_flight:
+                    if exhausted and not queues:
+                        return
+                    time.sleep(max(0.0, (next_ready or now) - now))
+                    continue
+
+                timeout = None if next_ready is None else max(0.0, next_ready - now)
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, (index, url, attempt) = in_flight.pop(future)
+                    active[host] -= 1
+                    result, retry_after = future.result()
+                    if retry_after is not None and attempt < self.max_retries:
+                        # Back off the whole host and retry this URL first
+                        delay = max(retry_after, self._backoff(attempt))
+                        host_ready[host] = max(host_ready.get(host, 0), time.monotonic() + delay)
+                        queues.setdefault(host, deque()).appendleft((index, url, attempt + 1))
+                        continue
+                    buffered -= 1
+                    yield dict(result, index=index, url=url, attempts=attempt)
+
+    def fetch_all(self, urls):
+        """Fetch urls concurrently and return the results in input order"""
+        results = [None] * len(urls)
+        for result in self.fetch_iter(urls):
+            results[result['index']] = result
+        return results
+
+    def close(self):
+        self.page_fetcher.close()
+
+    def _backoff(self, attempt):
+        # Full jitter keeps retries from many URLs on one host from bunching up
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _attempt(self, url):
+        """Fetch and extract one URL; returns (result, retry_after) with retry_after None if final"""
+        result = {'page': None, 'text': None, 'title': None, 'error': None}
+        if self.extraction_cache is not None:
+            cached = self.extraction_cache.get_by_url(url)
+            if cached is not None:
+                return dict(result, text=cached['text'], title=cached.get('title')), None
+        try:
+            if self.respect_robots and not self._allowed(url):
+                return dict(result, error="Disallowed by robots.txt"), None
+            page = self.page_fetcher.fetch(url)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            retry_after = _retry_after(e.response) if status in RETRY_STATUSES else None
+            return dict(result, error=str(e)), retry_after
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return dict(result, error=str(e)), 0.0
+        except Exception as e:
+            # Redirect loops, non-HTML content and invalid URLs are not retried
+            return dict(result, error=str(e)), None
+
+        article = self.extraction_cache.get(url, page.body) if self.extraction_cache is not None else None
+        if article is None:
+            article = extract_article(page.text)
+            if not article:
+                return dict(result, page=page, error="Could not extract meaningful content"), None
+            article = dict(article, truncated=page.truncated)
+            # A cut-off download may succeed in full next time, so only complete pages are cached
+            if self.extraction_cache is not None and not page.truncated:
+                self.extraction_cache.set(url, page.body, article)
+        return dict(result, page=page, text=article['text'], title=article.get('title')), None
+
+    def _allowed(self, url):
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        parser = self._robots.get(root)
+        if parser is None:
+            with self._robots_lock:
+                lock = self._robots_locks[root]
+            # One robots.txt download per site, even with several workers on it
+            with lock:
+                parser = self._robots.get(root)
+                if parser is None:
+                    parser = self._load_robots(root)
+                    self._robots.set(root, parser)
+                    delay = parser.crawl_delay(self.robots_agent)
+                    if delay:
+                        self._crawl_delays[parsed.netloc.lower()] = float(delay)
+        return parser.can_fetch(self.robots_agent, url)
+
+    def _load_robots(self, root):
+        parser = RobotFileParser(root + '/robots.txt')
+        try:
+            response = self.page_fetcher.session.get(
+                root + '/robots.txt', headers=self.page_fetcher.headers, timeout=self.page_fetcher.timeout
+            )
+        except requests.RequestException:
+            # Same as urllib.robotparser: an unreachable robots.txt allows everything
+            parser.allow_all = True
+            return parser
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        return parser
+
+def _retry_after(response):
+    """Seconds from a Retry-After header, or 0 if absent or not a number"""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', 0)))
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class SQLiteCacheStore:
+    """Disk tier for TTLCache so cached values survive restarts
+
+    Values are stored as JSON, so only JSON-serializable values can be
+    persisted. One file can hold several caches, separated by namespace.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+
+    def get(self, namespace, key):
+        """Return (value, expires_at) or None if the key is not stored"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace, key, value, expires_at):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at)
+            )
+
+    def delete(self, namespace, key):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def clear(self, namespace):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self):
+        """Delete every expired entry from the file"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),)
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ttl seconds
+
+    With a store, entries are written through to disk and looked up there on
+    a memory miss. ttl=None keeps entries until they are evicted. With
+    max_bytes, the least recently used entries are also evicted once the
+    sizes of the values held in memory (as measured by sizeof) add up to more
+    than max_bytes; a single value larger than that is not kept in memory.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, store=None, namespace='default', max_bytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Size of each value in memory, tracked only with max_bytes
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._forget(key)
+
+        if self.store is not None:
+            stored = self.store.get(self.namespace, key)
+            if stored is not None:
+                value, expires_at = stored
+                if expires_at is None or expires_at > now:
+                    with self._lock:
+                        self._remember(key, value, expires_at)
+                        self.hits += 1
+                    return value
+                self.store.delete(self.namespace, key)
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self.store is not None:
+            self.store.set(self.namespace, key, value, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._forget(key)
+        if self.store is not None:
+            self.store.delete(self.namespace, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+        if self.store is not None:
+            self.store.clear(self.namespace)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+            if self.max_bytes is not None:
+                stats.update(bytes=self._bytes, max_bytes=self.max_bytes)
+            return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, value, expires_at):
+        # Caller holds the lock
+        if self.max_bytes is not None:
+            self._forget(key)
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                return
+            self._sizes[key] = size
+            self._bytes += size
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
+
+    def _forget(self, key):
+        # Caller holds the lock
+        self._entries.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
@@ -1,37 +1,113 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, inspect, text
+from sqlalchemy import (
+    create_engine, event, Column, Integer, String, Float, Boolean, DateTime, Text, Index, Sequence,
+    inspect, text, insert, tuple_, or_
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError, IntegrityError
+from sqlalchemy.exc import OperationalError, IntegrityError, DataError, InterfaceError
 import sqlalchemy
+import hashlib
 import os
-from datetime import datetime
+import random
+from datetime import datetime, date, time as dt_time, timedelta
 import time
 
+# Without DATABASE_URL history is kept in a local SQLite file
+DEFAULT_DATABASE_URL = 'sqlite:///article_history.db'
+
 # Get database URL from environment
-DATABASE_URL = os.getenv('DATABASE_URL')
-
-# Create engine with proper SSL and connection pooling settings
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={
-        'sslmode': 'prefer'
-    },
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=300
-)
+DATABASE_URL = os.getenv('DATABASE_URL') or DEFAULT_DATABASE_URL
+
+def engine_options_from_env():
+    """Pool and connection settings, overridable through DB_* environment variables"""
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+        # Compiled SQL statements cached per engine
+        'query_cache_size': int(os.getenv('DB_STATEMENT_CACHE_SIZE', 500)),
+        'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10)),
+        'sslmode': os.getenv('DB_SSLMODE', 'prefer'),
+    }
+
+def build_engine(url=None, **options):
+    """Create an engine for url (default DATABASE_URL) with pooling from the environment
+
+    Keyword arguments override engine_options_from_env(). SQLite databases
+    are opened in WAL mode, so readers do not block the history writer.
+    """
+    url = url or DATABASE_URL
+    settings = dict(engine_options_from_env(), **options)
+    connect_timeout = settings.pop('connect_timeout')
+    sslmode = settings.pop('sslmode')
+
+    if url.startswith('sqlite'):
+        in_memory = url in ('sqlite://', 'sqlite:///:memory:')
+        if in_memory:
+            # A single shared connection; pool sizing does not apply
+            for name in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle'):
+                settings.pop(name)
+        new_engine = create_engine(
+            url,
+            connect_args={'check_same_thread': False, 'timeout': connect_timeout},
+            **settings
+        )
+
+        @event.listens_for(new_engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(connect_timeout * 1000)}")
+            cursor.close()
+
+        return new_engine
+
+    # Create engine with proper SSL and connection pooling settings
+    return create_engine(
+        url,
+        connect_args={
+            'sslmode': sslmode,
+            'connect_timeout': connect_timeout
+        },
+        pool_pre_ping=True,
+        **settings
+    )
+
+engine = build_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def configure(url=None, **options):
+    """Point the module engine and SessionLocal at another database or pool configuration"""
+    global engine
+    engine.dispose()
+    engine = build_engine(url, **options)
+    SessionLocal.configure(bind=engine)
+    return engine
+
 # Create base class for declarative models
 Base = declarative_base()
 
+def fallback_content_hash(content, url):
+    """Content hash for entries saved without one, so repeats are still merged"""
+    return hashlib.sha256(f"raw\0{url or ''}\0{content or ''}".encode('utf-8')).hexdigest()
+
+def retry_delay(attempt, base_delay=0.1, max_delay=5.0):
+    """Seconds to wait after failed attempt number attempt (counting from 0) of a write
+
+    Full jitter keeps concurrent writers from retrying in lockstep.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
 class ArticleHistory(Base):
     __tablename__ = "article_history"
 
-    id = Column(Integer, primary_key=True, server_default=text("nextval('article_history_id_seq'::regclass)"))
+    # The sequence is only used on Postgres; other databases number rows themselves
+    id = Column(Integer, Sequence('article_history_id_seq'), primary_key=True)
     title = Column(String(500))
     content = Column(Text)
     url = Column(String(1000))
@@ -39,6 +115,21 @@ class ArticleHistory(Base):
     confidence_score = Column(Float)
     source_credibility_score = Column(Float)
     analysis_date = Column(DateTime, default=datetime.utcnow)
+    # Hash of the cleaned text and model version, see utils.result_cache;
+    # a repeat submission updates the counters of the existing row
+    content_hash = Column(String(64))
+    submission_count = Column(Integer, nullable=False, default=1, server_default=text('1'))
+    last_submitted_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('uq_article_history_content_hash', 'content_hash', unique=True),
+        # Newest-first history pages, optionally for one verdict; the trailing id
+        # makes (analysis_date, id) a unique keyset cursor
+        Index('ix_article_history_analysis_date_id', 'analysis_date', 'id'),
+        Index('ix_article_history_is_fake_analysis_date_id', 'is_fake', 'analysis_date', 'id'),
+        # Pattern ops let Postgres use the index for url LIKE 'prefix%' in any collation
+        Index('ix_article_history_url', 'url', postgresql_ops={'url': 'varchar_pattern_ops'}),
+    )
     
     @classmethod
     def create_table(cls):
@@ -46,79 +137,287 @@ class ArticleHistory(Base):
         try:
             inspector = inspect(engine)
             
-            # Create sequence first (if not exists)
-            with engine.begin() as connection:
-                connection.execute(text("""
-                    DO $$ 
-                    BEGIN
-                        CREATE SEQUENCE IF NOT EXISTS article_history_id_seq
-                        START WITH 1
-                        INCREMENT BY 1
-                        NO MINVALUE
-                        NO MAXVALUE
-                        CACHE 1;
-                    EXCEPTION WHEN duplicate_table THEN
-                        NULL;
-                    END $$;
-                """))
-            
-            # Create table if it doesn't exist
-            if not inspector.has_table(cls.__tablename__):
-                with engine.begin() as connection:
-                    connection.execute(text("""
-                        CREATE TABLE IF NOT EXISTS article_history (
-                            id INTEGER PRIMARY KEY DEFAULT nextval('article_history_id_seq'),
-                            title VARCHAR(500),
-                            content TEXT,
-                            url VARCHAR(1000),
-                            is_fake BOOLEAN,
-                            confidence_score FLOAT,
-                            source_credibility_score FLOAT,
-                            analysis_date TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                        )
-                    """))
+            if engine.dialect.name == 'postgresql':
+                cls._create_postgres_table(inspector)
+            elif not inspector.has_table(cls.__tablename__):
+                # Other databases use the portable DDL generated from the model
+                cls.__table__.create(engine, checkfirst=True)
                 print("Table created successfully")
             else:
                 print("Table already exists")
+            
+            # Bring existing tables up to the current schema
+            cls._add_missing_columns()
+            
+            # content_hash used to allow duplicates; fold them into the newest row first
+            index_names = {index['name'] for index in inspect(engine).get_indexes(cls.__tablename__)}
+            if 'uq_article_history_content_hash' not in index_names:
+                cls._deduplicate_content_hashes()
+            
+            # Create any missing indexes
+            for index in cls.__table__.indexes:
+                index.create(engine, checkfirst=True)
                 
         except Exception as e:
             print(f"Error in table creation: {str(e)}")
             raise e
 
     @classmethod
-    def add_entry(cls, session, title, content, url, is_fake, confidence_score, source_credibility_score):
-        """Add a new entry with proper error handling and retry logic"""
-        max_retries = 3
-        retry_delay = 1
-        last_error = None
+    def _create_postgres_table(cls, inspector):
+        """Create the sequence and table with Postgres DDL that tolerates concurrent starts"""
+        # Create sequence first (if not exists)
+        with engine.begin() as connection:
+            connection.execute(text("""
+                DO $$ 
+                BEGIN
+                    CREATE SEQUENCE IF NOT EXISTS article_history_id_seq
+                    START WITH 1
+                    INCREMENT BY 1
+                    NO MINVALUE
+                    NO MAXVALUE
+                    CACHE 1;
+                EXCEPTION WHEN duplicate_table THEN
+                    NULL;
+                END $$;
+            """))
+        
+        # Create table if it doesn't exist
+        if not inspector.has_table(cls.__tablename__):
+            with engine.begin() as connection:
+                connection.execute(text("""
+                    CREATE TABLE IF NOT EXISTS article_history (
+                        id INTEGER PRIMARY KEY DEFAULT nextval('article_history_id_seq'),
+                        title VARCHAR(500),
+                        content TEXT,
+                        url VARCHAR(1000),
+                        is_fake BOOLEAN,
+                        confidence_score FLOAT,
+                        source_credibility_score FLOAT,
+                        analysis_date TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        content_hash VARCHAR(64),
+                        submission_count INTEGER NOT NULL DEFAULT 1,
+                        last_submitted_at TIMESTAMP WITHOUT TIME ZONE
+                    )
+                """))
+            print("Table created successfully")
+        else:
+            print("Table already exists")
+
+    @classmethod
+    def _add_missing_columns(cls):
+        existing = {column['name'] for column in inspect(engine).get_columns(cls.__tablename__)}
+        with engine.begin() as connection:
+            for column in cls.__table__.columns:
+                if column.name in existing:
+                    continue
+                # IF NOT EXISTS keeps concurrent starts on Postgres from racing
+                if_missing = " IF NOT EXISTS" if engine.dialect.name == 'postgresql' else ""
+                ddl = (f"ALTER TABLE {cls.__tablename__} ADD COLUMN{if_missing} {column.name} "
+                       f"{column.type.compile(dialect=engine.dialect)}")
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg.text}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                print(f"Added column {column.name}")
+
+    @classmethod
+    def _deduplicate_content_hashes(cls):
+        """Keep one row per content hash, counting the duplicates as submissions"""
+        with engine.begin() as connection:
+            connection.execute(text("""
+                UPDATE article_history
+                SET submission_count = (
+                    SELECT count(*) FROM article_history duplicate
+                    WHERE duplicate.content_hash = article_history.content_hash
+                )
+                WHERE content_hash IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM article_history newer
+                    WHERE newer.content_hash = article_history.content_hash AND newer.id > article_history.id
+                )
+            """))
+            result = connection.execute(text("""
+                UPDATE article_history
+                SET content_hash = NULL
+                WHERE content_hash IS NOT NULL AND EXISTS (
+                    SELECT 1 FROM article_history newer
+                    WHERE newer.content_hash = article_history.content_hash AND newer.id > article_history.id
+                )
+            """))
+            connection.execute(text("DROP INDEX IF EXISTS ix_article_history_content_hash"))
+        if result.rowcount:
+            print(f"Merged {result.rowcount} duplicate history rows into their newest entry")
+
+    @classmethod
+    def _upsert(cls, session):
+        """INSERT that bumps the counters of an existing row with the same content hash"""
+        dialect = session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return insert(cls)
+        statement = dialect_insert(cls)
+        return statement.on_conflict_do_update(
+            index_elements=[cls.content_hash],
+            set_={
+                'submission_count': cls.submission_count + statement.excluded.submission_count,
+                'last_submitted_at': statement.excluded.last_submitted_at,
+            }
+        )
+
+    @classmethod
+    def add_entry(cls, session, title, content, url, is_fake, confidence_score, source_credibility_score,
+                  content_hash=None):
+        """Add a new entry, or count a repeat submission of the same content
+
+        Makes a single attempt and raises on failure without waiting; callers
+        that need retries queue the entry on a HistoryWriter instead.
+        """
+        try:
+            row = cls._row_values(title, content, url, is_fake, confidence_score, source_credibility_score,
+                                  content_hash)
+            entry_id = session.scalar(cls._upsert(session).values(**row).returning(cls.id))
+            session.commit()
+            return session.get(cls, entry_id)
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to add entry: {str(e)}")
+            raise
+
+    @classmethod
+    def add_entries_bulk(cls, session, entries, chunk_size=1000, max_retries=1, base_delay=0.1, max_delay=5.0):
+        """Insert many entries with one multi-row INSERT ... RETURNING per chunk
+
+        entries are dicts with the add_entry keyword arguments. Entries whose
+        content hash is already stored, or repeated within the chunk, update
+        the submission counters of a single row instead. Each chunk is
+        committed on its own. Rows that fail validation or a constraint are
+        reported individually while the rest of their chunk is still saved.
+        By default each chunk is tried once and the call never waits: rows that
+        hit a connection error come back as retryable errors, and the caller
+        schedules the next attempt itself using retry_delay() (HistoryWriter
+        does this). max_retries above 1 retries in place with jittered
+        exponential backoff, which blocks the calling thread; the transaction is
+        rolled back first so no connection is held while waiting.
+
+        Returns {'ids': [...], 'errors': [{'index', 'error'}]}, with ids in input
+        order and None for rows that were not saved. Errors of rows that could
+        not be written because the database was unreachable have 'retryable'.
+        """
+        if max_retries < 1:
+            raise ValueError(f"max_retries must be at least 1, got {max_retries}")
+        ids = []
+        errors = []
+        rows = []
+        # Input indexes of the entries merged into each row
+        groups = []
+        rows_by_hash = {}
         
+        def flush_chunk():
+            chunk_ids = cls._insert_chunk(session, rows, groups, errors, max_retries, base_delay, max_delay)
+            for group, entry_id in zip(groups, chunk_ids):
+                for index in group:
+                    ids[index] = entry_id
+            rows.clear()
+            groups.clear()
+            rows_by_hash.clear()
+        
+        for index, entry in enumerate(entries):
+            ids.append(None)
+            try:
+                row = cls._row_values(**entry)
+            except Exception as e:
+                errors.append({'index': index, 'error': f"Invalid entry: {str(e)}"})
+                continue
+            
+            # One statement may not upsert the same key twice, so repeats are merged here
+            position = rows_by_hash.get(row['content_hash'])
+            if position is not None:
+                merged = rows[position]
+                merged['submission_count'] += 1
+                merged['last_submitted_at'] = max(merged['last_submitted_at'], row['last_submitted_at'])
+                groups[position].append(index)
+                continue
+            rows_by_hash[row['content_hash']] = len(rows)
+            rows.append(row)
+            groups.append([index])
+            if len(rows) >= chunk_size:
+                flush_chunk()
+        if rows:
+            flush_chunk()
+        
+        errors.sort(key=lambda error: error['index'])
+        if errors:
+            print(f"Bulk insert saved {len(ids) - len(errors)} of {len(ids)} entries")
+        return {'ids': ids, 'errors': errors}
+
+    @classmethod
+    def _row_values(cls, title, content, url, is_fake, confidence_score, source_credibility_score,
+                    content_hash=None, analysis_date=None):
+        analysis_date = analysis_date or datetime.utcnow()
+        return {
+            'title': (title or "")[:500],
+            'content': (content or "")[:1000],
+            'url': (url or "")[:1000],
+            'is_fake': bool(is_fake),
+            'confidence_score': float(confidence_score),
+            'source_credibility_score': float(source_credibility_score) if source_credibility_score is not None else None,
+            'analysis_date': analysis_date,
+            'content_hash': content_hash or fallback_content_hash(content, url),
+            'submission_count': 1,
+            'last_submitted_at': analysis_date
+        }
+
+    @classmethod
+    def _insert_chunk(cls, session, rows, groups, errors, max_retries, base_delay, max_delay):
+        """Upsert one chunk and commit, returning the row ids in order"""
+        # Postgres rejects sort_by_parameter_order on an upsert, so ids are matched
+        # back to their rows by content hash, which is unique within a chunk
+        statement = cls._upsert(session).returning(cls.id, cls.content_hash)
         for attempt in range(max_retries):
             try:
-                entry = cls(
-                    title=(title or "")[:500],
-                    content=(content or "")[:1000],
-                    url=(url or "")[:1000],
-                    is_fake=bool(is_fake),
-                    confidence_score=float(confidence_score),
-                    source_credibility_score=float(source_credibility_score) if source_credibility_score is not None else None,
-                    analysis_date=datetime.utcnow()
-                )
-                session.add(entry)
-                session.flush()  # Test the insert before committing
+                # A list of parameter sets is sent as batched multi-row INSERTs
+                ids_by_hash = {content_hash: entry_id
+                               for entry_id, content_hash in session.execute(statement, rows).all()}
                 session.commit()
-                return entry
-                
-            except Exception as e:
-                last_error = e
+                return [ids_by_hash.get(row['content_hash']) for row in rows]
+            except (IntegrityError, DataError):
+                # A bad row fails the whole statement; find it row by row
                 session.rollback()
-                if attempt < max_retries - 1:
-                    print(f"Attempt {attempt + 1} failed, retrying... Error: {str(e)}")
-                    time.sleep(retry_delay)
-                    continue
-                break
-                
-        print(f"Failed to add entry after {max_retries} attempts")
-        raise last_error
+                return cls._insert_rows(session, rows, groups, errors)
+            except (OperationalError, InterfaceError) as e:
+                session.rollback()
+                if attempt == max_retries - 1:
+                    for group in groups:
+                        for index in group:
+                            errors.append({'index': index, 'error': str(e), 'retryable': True})
+                    return [None] * len(rows)
+                delay = retry_delay(attempt, base_delay, max_delay)
+                print(f"Bulk insert attempt {attempt + 1} failed, retrying in {delay:.2f}s... Error: {str(e)}")
+                time.sleep(delay)
+
+    @classmethod
+    def _insert_rows(cls, session, rows, groups, errors):
+        """Upsert rows one at a time in savepoints, recording the rows that fail"""
+        chunk_ids = []
+        for group, row in zip(groups, rows):
+            try:
+                with session.begin_nested():
+                    chunk_ids.append(session.scalar(cls._upsert(session).values(**row).returning(cls.id)))
+            except Exception as e:
+                chunk_ids.append(None)
+                # The driver's message, without the SQL statement and parameters
+                for index in group:
+                    errors.append({'index': index, 'error': str(getattr(e, 'orig', None) or e)})
+        session.commit()
+        return chunk_ids
+
+    @classmethod
+    def find_by_content_hash(cls, session, content_hash):
+        """Entry analyzed from the same content, or None"""
+        return session.query(cls).filter(cls.content_hash == content_hash).first()
 
     @classmethod
     def get_history(cls, session, limit=50):
@@ -128,3 +427,60 @@ class ArticleHistory(Base):
         except Exception as e:
             print(f"Error retrieving history: {str(e)}")
             return []
+
+    @classmethod
+    def get_history_page(cls, session, limit=50, before=None, is_fake=None, start_date=None, end_date=None,
+                         domain=None):
+        """One page of history, newest first, using keyset pagination
+
+        Entries are ordered by their first analysis (analysis_date). A repeat
+        submission only updates submission_count and last_submitted_at, so
+        the entry keeps its place; this keeps pages stable while they are
+        browsed. before is the cursor returned with the previous page, so each page is
+        an index range scan however deep it is. is_fake filters by verdict,
+        start_date/end_date by analysis date (a date as end_date includes that
+        whole day) and domain by the URL's host, including its www. form.
+        Returns (entries, cursor); cursor is None on the last page.
+        """
+        try:
+            query = session.query(cls)
+            if is_fake is not None:
+                query = query.filter(cls.is_fake == bool(is_fake))
+            if start_date is not None:
+                query = query.filter(cls.analysis_date >= start_date)
+            if end_date is not None:
+                if not isinstance(end_date, datetime) and isinstance(end_date, date):
+                    end_date = datetime.combine(end_date + timedelta(days=1), dt_time.min)
+                    query = query.filter(cls.analysis_date < end_date)
+                else:
+                    query = query.filter(cls.analysis_date <= end_date)
+            if domain:
+                query = query.filter(or_(*cls._domain_conditions(domain)))
+            if before is not None:
+                query = query.filter(tuple_(cls.analysis_date, cls.id) < tuple_(*before))
+            
+            entries = query.order_by(cls.analysis_date.desc(), cls.id.desc()).limit(limit + 1).all()
+            if len(entries) <= limit:
+                return entries, None
+            entries = entries[:limit]
+            return entries, (entries[-1].analysis_date, entries[-1].id)
+        except Exception as e:
+            print(f"Error retrieving history: {str(e)}")
+            return [], None
+
+    @classmethod
+    def _domain_conditions(cls, domain):
+        """URL prefix matches for a domain, so the url index can be used"""
+        domain = domain.strip().lower()
+        if '://' in domain:
+            domain = domain.split('://', 1)[1]
+        domain = domain.split('/', 1)[0]
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        escaped = domain.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions = []
+        for scheme in ('https', 'http'):
+            for prefix in ('', 'www.'):
+                conditions.append(cls.url == f'{scheme}://{prefix}{domain}')
+                conditions.append(cls.url.like(f'{scheme}://{prefix}{escaped}/%', escape='\\'))
+        return conditions
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from utils.cache import TTLCache
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref_src'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url):
+    """Canonical form of url used as a cache key
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters (utm_* and click ids) and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+def body_hash(body):
+    """Digest of a downloaded page body"""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ExtractionCache:
+    """Extracted article text and title, kept on disk between runs
+
+    Entries are keyed by the hash of the page body, so a re-download of an
+    unchanged page skips HTML parsing. Each normalized URL also points at
+    the entry it last produced; get_by_url serves that for url_ttl seconds
+    without any download at all. Entries are stored as zlib-compressed
+    JSON, and the least recently used are evicted once the file holds more
+    than max_bytes of them. Recent lookups are answered from memory.
+    """
+
+    def __init__(self, path='extraction_cache.db', max_bytes=256 * 2 ** 20, url_ttl=3600,
+                 memory_size=256, compression_level=6):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self.compression_level = compression_level
+        self._by_url = TTLCache(maxsize=memory_size, ttl=url_ttl)
+        self._by_hash = TTLCache(maxsize=memory_size)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS extractions (
+                    body_hash BLOB PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_extractions_last_used ON extractions (last_used)"
+            )
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    body_hash BLOB NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS ix_urls_body_hash ON urls (body_hash)")
+            self._total_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()[0]
+
+    def get_by_url(self, url):
+        """The entry last stored for url if it is younger than url_ttl, else None"""
+        key = normalize_url(url)
+        entry = self._by_url.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT e.body_hash, e.data, u.fetched_at FROM urls u "
+                "JOIN extractions e ON e.body_hash = u.body_hash WHERE u.url = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        digest, data, fetched_at = row
+        age = time.time() - fetched_at
+        if self.url_ttl is not None and age >= self.url_ttl:
+            return None
+
+        entry = self._decode(data)
+        self._touch(digest)
+        self._by_hash.set(digest, entry)
+        self._by_url.set(key, entry, ttl=None if self.url_ttl is None else self.url_ttl - age)
+        return entry
+
+    def get(self, url, body):
+        """The entry extracted from this exact body, or None
+
+        A hit also renews url's pointer, as if the entry had been stored again.
+        """
+        digest = body_hash(body)
+        entry = self._by_hash.get(digest)
+        if entry is None:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT data FROM extractions WHERE body_hash = ?", (digest,)
+                ).fetchone()
+            if row is None:
+                return None
+            entry = self._decode(row[0])
+            self._by_hash.set(digest, entry)
+
+        key = normalize_url(url)
+        with self._lock, self._connection:
+            now = time.time()
+            self._connection.execute(
+                "UPDATE extractions SET last_used = ? WHERE body_hash = ?", (now, digest)
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO urls (url, body_hash, fetched_at) VALUES (?, ?, ?)",
+                (key, digest, now)
+            )
+        self._by_url.set(key, entry)
+        return entry
+
+    def set(self, url, body, entry):
+        """Store entry (a JSON-serializable dict such as {'text', 'title'}) for url and body"""
+        digest = body_hash(body)
+        data = zlib.compress(json.dumps(entry, separators=(',', ':')).encode('utf-8'),
+                             self.compression_level)
+        key = normalize_url(url)
+        with self._lock, self._connection:
+            now = time.time()
+            previous = self._connection.execute(
+                "SELECT size FROM extractions WHERE body_hash = ?", (digest,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extractions (body_hash, data, size, last_used) VALUES (?, ?, ?, ?)",
+                (digest, data, len(data), now)
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO urls (url, body_hash, fetched_at) VALUES (?, ?, ?)",
+                (key, digest, now)
+            )
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        self._by_hash.set(digest, entry)
+        self._by_url.set(key, entry)
+
+    def stats(self):
+        with self._lock:
+            entries, urls = self._connection.execute(
+                "SELECT (SELECT COUNT(*) FROM extractions), (SELECT COUNT(*) FROM urls)"
+            ).fetchone()
+            return {
+                'entries': entries,
+                'urls': urls,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'memory': self._by_url.stats()
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _decode(self, data):
+        return json.loads(zlib.decompress(data))
+
+    def _touch(self, digest):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE extractions SET last_used = ? WHERE body_hash = ?", (time.time(), digest)
+            )
+
+    def _evict(self):
+        # Caller holds the lock inside a transaction. Evict down to 90% so
+        # the next few stores do not each trigger another pass.
+        target = self.max_bytes * 0.9
+        evicted = []
+        for digest, size in self._connection.execute(
+            "SELECT body_hash, size FROM extractions ORDER BY last_used"
+        ).fetchall():
+            if self._total_bytes <= target:
+                break
+            evicted.append((digest,))
+            self._total_bytes -= size
+        self._connection.executemany("DELETE FROM extractions WHERE body_hash = ?", evicted)
+        self._connection.executemany("DELETE FROM urls WHERE body_hash = ?", evicted)
+        for (digest,) in evicted:
+            self._by_hash.delete(digest)
+        # URLs pointing at evicted entries are gone from disk; drop them from memory too
+        self._by_url.clear()
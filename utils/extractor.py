@@ -0,0 +1,52 @@
+import json
+import trafilatura
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# Extracted text shorter than this is treated as a failed extraction
+MIN_ARTICLE_LENGTH = 100
+
+# lxml parses several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+def extract_article_text(html, parser=DEFAULT_PARSER):
+    """Extract the article body from HTML, or return None if nothing meaningful is found
+
+    parser is the BeautifulSoup parser used when trafilatura finds nothing.
+    """
+    article = extract_article(html, parser)
+    return article['text'] if article else None
+
+def extract_article(html, parser=DEFAULT_PARSER):
+    """Extract the article body and title from HTML as {'text', 'title'}, or None
+
+    title is None when the page does not name one.
+    """
+    extracted = trafilatura.extract(html, output_format='json', with_metadata=True,
+                                    include_comments=False, no_fallback=False)
+    if extracted:
+        extracted = json.loads(extracted)
+        text = extracted.get('text')
+        if text and len(text.strip()) > MIN_ARTICLE_LENGTH:
+            return {'text': text, 'title': extracted.get('title') or None}
+
+    try:
+        soup = BeautifulSoup(html, parser)
+    except FeatureNotFound:
+        soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.get_text().strip() if soup.title else None
+    for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+        element.decompose()
+
+    for selector in ['article', 'main', '.article-body', '.story-body']:
+        content = soup.select_one(selector)
+        if content:
+            paragraphs = content.find_all('p')
+            text = '\n'.join(p.get_text().strip() for p in paragraphs)
+            if len(text.strip()) > MIN_ARTICLE_LENGTH:
+                return {'text': text, 'title': title or None}
+
+    return None
@@ -0,0 +1,222 @@
+import copy
+import re
+import socket
+import ssl
+import time
+import requests
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from utils.cache import TTLCache
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+# Content types worth downloading for article extraction
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', 'text/xml', 'application/xml')
+
+_TAG_PATTERN = re.compile(rb'<[^>]*>')
+_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+class UnsupportedContentType(requests.RequestException):
+    """The response is not an HTML or text document"""
+
+
+def describe_certificate(certificate):
+    """Summarize a peer certificate from SSLSocket.getpeercert() as TLS info"""
+    expires_at = ssl.cert_time_to_seconds(certificate['notAfter'])
+    issuer = dict(item for entry in certificate.get('issuer', ()) for item in entry)
+    return {
+        'has_ssl': True,
+        'issuer': issuer.get('organizationName') or issuer.get('commonName'),
+        'expires': datetime.utcfromtimestamp(expires_at).isoformat(),
+        'days_to_expiry': int((expires_at - time.time()) // 86400)
+    }
+
+
+class FetchedPage:
+    """One downloaded page, shared by content extraction and source checks"""
+
+    def __init__(self, url, final_url, status_code, headers, body, encoding,
+                 redirect_chain, tls_info, from_cache=False, truncated=None):
+        self.url = url
+        self.final_url = final_url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        # URLs visited before final_url, in order
+        self.redirect_chain = redirect_chain
+        # Certificate details of the final connection, None for plain http
+        self.tls_info = tls_info
+        # True when the body came from the conditional-GET cache
+        self.from_cache = from_cache
+        # Why the download stopped early ('max_bytes', 'max_seconds' or
+        # 'text_limit'), None if the whole body was read
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        try:
+            return self.body.decode(self.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            # Unknown charset name declared by the page
+            return self.body.decode('utf-8', errors='replace')
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+
+class PageFetcher:
+    """Download each URL once, revalidating repeat requests with conditional GETs
+
+    Pages that carry an ETag or Last-Modified header are kept in an LRU cache
+    holding at most cache_size pages and cache_bytes of page bodies; the next
+    fetch of the same URL sends If-None-Match / If-Modified-Since and a 304
+    response reuses the cached body. cache_size=0 disables the cache.
+
+    Bodies are streamed: non-HTML responses are rejected from their headers,
+    and reading stops after max_bytes or max_seconds, or once the page has
+    reached max_text_chars of text (estimated by stripping tags).
+    """
+
+    def __init__(self, timeout=10, cache_size=256, pool_size=10, headers=None, max_bytes=5 * 2 ** 20,
+                 max_seconds=20, max_text_chars=200000, chunk_size=64 * 1024, cache_bytes=32 * 2 ** 20):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_text_chars = max_text_chars
+        self.chunk_size = chunk_size
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.cache = TTLCache(maxsize=cache_size, max_bytes=cache_bytes, sizeof=lambda page: len(page.body))
+
+    def fetch(self, url):
+        """Fetch a URL, raising requests exceptions on network or HTTP errors"""
+        cached = self.cache.get(url)
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        start = time.monotonic()
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            # The peer certificate is only reachable before the body is read
+            tls_info = self._peer_tls_info(response)
+            if response.status_code == 304 and cached is not None:
+                # The cached page is shared between callers, so hand out a copy
+                page = copy.copy(cached)
+                page.from_cache = True
+                return page
+
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            media_type = content_type.split(';', 1)[0].strip().lower()
+            if media_type and media_type not in HTML_CONTENT_TYPES:
+                raise UnsupportedContentType(f"Not an HTML page: {media_type}", response=response)
+
+            body, truncated = self._read_body(response, start)
+            page = FetchedPage(
+                url=url,
+                final_url=response.url,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                body=body,
+                encoding=_declared_charset(content_type) or _sniff_charset(body) or 'utf-8',
+                redirect_chain=[r.url for r in response.history],
+                tls_info=tls_info,
+                truncated=truncated
+            )
+
+        if page.etag or page.last_modified:
+            self.cache.set(url, page)
+        return page
+
+    def close(self):
+        self.session.close()
+
+    def _read_body(self, response, start):
+        """Read the body in chunks until it ends or a budget is used up"""
+        chunks = []
+        size = 0
+        text_chars = 0
+        deadline = start + self.max_seconds
+        while True:
+            chunk = self._read_chunk(response, deadline)
+            if chunk is None:
+                return b''.join(chunks), 'max_seconds'
+            if not chunk:
+                break
+            if size + len(chunk) > self.max_bytes:
+                chunks.append(chunk[:self.max_bytes - size])
+                return b''.join(chunks), 'max_bytes'
+            chunks.append(chunk)
+            size += len(chunk)
+            text_chars += len(_TAG_PATTERN.sub(b'', chunk))
+
+            if text_chars >= self.max_text_chars:
+                return b''.join(chunks), 'text_limit'
+        return b''.join(chunks), None
+
+    def _read_chunk(self, response, deadline):
+        """Return whatever part of the body arrives next, b'' at its end, or None at the deadline
+
+        Each socket read waits at most until the deadline, so a server that
+        trickles bytes cannot keep the download going past max_seconds.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        sock = _response_socket(response)
+        if sock is not None:
+            sock.settimeout(min(self.timeout, remaining))
+        raw = response.raw
+        try:
+            # read1 returns after a single read from the socket; older urllib3 only has read
+            if hasattr(raw, 'read1'):
+                return raw.read1(self.chunk_size, decode_content=True)
+            return raw.read(self.chunk_size, decode_content=True)
+        except (ReadTimeoutError, socket.timeout) as e:
+            if time.monotonic() >= deadline:
+                return None
+            raise requests.exceptions.ReadTimeout(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+
+    def _peer_tls_info(self, response):
+        if not response.url.startswith('https://'):
+            return None
+        try:
+            connection = getattr(response.raw, 'connection', None) or response.raw._connection
+            return describe_certificate(connection.sock.getpeercert())
+        except Exception:
+            # requests verified the certificate, only its details are unavailable
+            return {'has_ssl': True, 'issuer': None, 'expires': None, 'days_to_expiry': None}
+
+def _response_socket(response):
+    connection = getattr(response.raw, 'connection', None) or getattr(response.raw, '_connection', None)
+    return getattr(connection, 'sock', None)
+
+def _declared_charset(content_type):
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            return value.strip().strip('"\'')
+    return None
+
+def _sniff_charset(body):
+    match = _CHARSET_PATTERN.search(body[:4096])
+    return match.group(1).decode('ascii') if match else None
@@ -0,0 +1,119 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from utils.model_bundle import (
+    load_manifest, model_classes, write_bundle, DEFAULT_HASHING_BUNDLE_PATH, MANIFEST_NAME
+)
+
+DEFAULT_N_FEATURES = 2 ** 20
+
+def make_hashing_vectorizer(n_features=DEFAULT_N_FEATURES, lowercase=True,
+                            token_pattern=r'(?u)\b\w\w+\b', ngram_range=(1, 1)):
+    """Stateless vectorizer producing raw term counts in a fixed feature space"""
+    return HashingVectorizer(
+        n_features=n_features,
+        lowercase=lowercase,
+        token_pattern=token_pattern,
+        ngram_range=tuple(ngram_range),
+        alternate_sign=False,
+        norm=None
+    )
+
+
+class StreamingIdf:
+    """Document frequencies accumulated chunk by chunk over hashed count matrices
+
+    Memory is one counter per hashed feature, however large the vocabulary grows.
+    The resulting weights match TfidfTransformer(smooth_idf=True).
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES):
+        self.n_features = n_features
+        self.n_documents = 0
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+
+    def partial_fit(self, counts):
+        """Add a chunk of documents given as a sparse count matrix"""
+        counts = sp.csr_matrix(counts)
+        self.n_documents += counts.shape[0]
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        return self
+
+    @property
+    def idf(self):
+        return np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1.0
+
+
+def tfidf_transform(counts, idf, sublinear_tf=False):
+    """Weight a hashed count matrix by idf and L2-normalize its rows"""
+    counts = sp.csr_matrix(counts, dtype=np.float64)
+    if sublinear_tf:
+        counts.data = 1.0 + np.log(counts.data)
+    counts.data *= idf[counts.indices]
+    return normalize(counts, norm='l2', copy=False)
+
+def save_hashing_bundle(vectorizer, idf, model, path=DEFAULT_HASHING_BUNDLE_PATH, sublinear_tf=False):
+    """Export a hashing vectorizer, streaming IDF weights and binary linear classifier"""
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    if coef.shape[0] != 1:
+        raise ValueError("Only binary classifiers can be exported as a bundle")
+    params = vectorizer.get_params()
+    arrays = {
+        'idf': np.asarray(idf, dtype=np.float64),
+        'coef': coef[0],
+        'intercept': np.asarray(model.intercept_, dtype=np.float64),
+    }
+    manifest = {
+        'backend': 'hashing',
+        'classes': model_classes(model),
+        'n_features': params['n_features'],
+        'vectorizer': {
+            'lowercase': params['lowercase'],
+            'token_pattern': params['token_pattern'],
+            'ngram_range': list(params['ngram_range']),
+            'sublinear_tf': sublinear_tf,
+        },
+    }
+    return write_bundle(path, arrays, manifest)
+
+
+class HashingScorer:
+    """Score texts from a hashing bundle; no vocabulary is stored or loaded"""
+
+    def __init__(self, path=DEFAULT_HASHING_BUNDLE_PATH, mmap_mode='r'):
+        self.path = path
+        self.manifest = load_manifest(path)
+        if self.manifest['backend'] != 'hashing':
+            raise ValueError(f"Unsupported bundle backend: {self.manifest['backend']}")
+        self.manifest_path = os.path.join(path, MANIFEST_NAME)
+
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        self.idf = load('idf')
+        self.coef = load('coef')
+        self.intercept = float(np.asarray(load('intercept'))[0])
+        self.classes = self.manifest['classes']
+        self.n_features = self.manifest['n_features']
+
+        settings = self.manifest['vectorizer']
+        self._sublinear_tf = settings['sublinear_tf']
+        self.vectorizer = make_hashing_vectorizer(
+            n_features=self.n_features,
+            lowercase=settings['lowercase'],
+            token_pattern=settings['token_pattern'],
+            ngram_range=settings['ngram_range']
+        )
+
+    def transform(self, texts):
+        return tfidf_transform(self.vectorizer.transform(texts), self.idf, self._sublinear_tf)
+
+    def decision_function(self, texts):
+        return self.transform(texts) @ self.coef + self.intercept
+
+    def predict_proba(self, texts):
+        """Class probabilities in the order of self.classes, like predict_proba in sklearn"""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - positive, positive])
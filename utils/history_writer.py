@@ -0,0 +1,239 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()
+
+class HistoryWriter:
+    """Write analysis records to article_history from a background thread
+
+    submit() only puts the record on a bounded in-memory queue, so callers
+    never wait on the database. The worker thread writes queued records with
+    ArticleHistory.add_entries_bulk once batch_size records are waiting or
+    flush_interval seconds have passed. Records that cannot be written
+    because the database is unreachable are retried up to max_attempts times
+    with jittered backoff; the thread keeps writing new batches while a retry
+    waits. Records that still fail, or that arrive while the queue is full,
+    are appended to a JSON Lines spill file and replayed once writes succeed
+    again. Pending records are drained when the process exits.
+    """
+
+    def __init__(self, session_factory, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 spill_path='history_spill.jsonl', replay_interval=30.0, max_attempts=3,
+                 retry_base_delay=0.5, retry_max_delay=10.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.replay_interval = replay_interval
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        # (retry_at, attempt, records) for batches waiting for another attempt
+        self._retries = []
+        self._spill_lock = threading.Lock()
+        self._last_replay = 0.0
+        self._closed = False
+        self.counters = {'written': 0, 'spilled': 0, 'replayed': 0, 'dropped': 0}
+
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record):
+        """Queue one record (add_entry keyword arguments) without blocking
+
+        Returns False if the queue was full and the record went to the spill file.
+        """
+        record = dict(record)
+        record.setdefault('analysis_date', datetime.utcnow())
+        if not self._closed:
+            try:
+                self._queue.put_nowait(record)
+                return True
+            except queue.Full:
+                pass
+        self._spill([record])
+        return False
+
+    def flush(self):
+        """Block until every record submitted so far has been written or spilled
+
+        Records waiting for a retry count as pending.
+        """
+        self._queue.join()
+
+    def close(self, timeout=10):
+        """Stop accepting records, write what is queued and stop the worker thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return dict(self.counters, queued=self._queue.qsize(), retrying=sum(len(r) for _, _, r in self._retries),
+                    spill_pending=os.path.exists(self.spill_path))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            if self._retries:
+                # Wake up in time for the next scheduled retry
+                deadline = min(deadline, min(retry_at for retry_at, _, _ in self._retries))
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            written = self._attempt(batch, 0) if batch else True
+            written = self._run_due_retries(stopping) and written
+
+            if written and not self._retries and time.monotonic() - self._last_replay >= self.replay_interval:
+                self._replay_spill()
+
+    def _attempt(self, records, attempt):
+        """Write queued records, scheduling a retry for those the database could not take
+
+        Returns False if any record is still unwritten.
+        """
+        retry = self._write(records)
+        if retry and attempt + 1 < self.max_attempts:
+            from utils.database import retry_delay
+            delay = retry_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+            print(f"Retrying {len(retry)} history records in {delay:.2f}s")
+            self._retries.append((time.monotonic() + delay, attempt + 1, retry))
+        elif retry:
+            self._spill(retry)
+        # Scheduled records stay pending for flush() until their last attempt
+        for _ in range(len(records) - (len(retry) if attempt + 1 < self.max_attempts else 0)):
+            self._queue.task_done()
+        return not retry
+
+    def _run_due_retries(self, stopping):
+        """Retry the batches whose backoff has passed; when stopping, spill the rest"""
+        now = time.monotonic()
+        due = [item for item in self._retries if stopping or item[0] <= now]
+        self._retries = [item for item in self._retries if not (stopping or item[0] <= now)]
+        written = True
+        for _, attempt, records in due:
+            if stopping:
+                # Do not hold up shutdown with backoff waits; the spill file is replayed on the next start
+                self._spill(records)
+                for _ in records:
+                    self._queue.task_done()
+                continue
+            written = self._attempt(records, attempt) and written
+        return written
+
+    def _write(self, batch):
+        """Write a batch once, without waiting; returns the records that failed for a retryable reason"""
+        try:
+            session = self.session_factory()
+            try:
+                from utils.database import ArticleHistory
+                result = ArticleHistory.add_entries_bulk(session, batch, max_retries=1)
+            finally:
+                session.close()
+        except Exception as e:
+            print(f"Warning: history write failed for {len(batch)} records: {str(e)}")
+            return batch
+
+        retry = [batch[error['index']] for error in result['errors'] if error.get('retryable')]
+        self.counters['dropped'] += len(result['errors']) - len(retry)
+        self.counters['written'] += len(batch) - len(result['errors'])
+        return retry
+
+    def _spill(self, records):
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=_encode) + '\n')
+            self.counters['spilled'] += len(records)
+
+    def _replay_spill(self):
+        """Move the spill file aside and write its records; anything still failing is spilled again
+
+        The byte offset reached is saved after every batch, so a replay that
+        was interrupted resumes where it stopped instead of writing (and
+        counting as resubmissions) the records it already replayed.
+        """
+        self._last_replay = time.monotonic()
+        replay_path = self.spill_path + '.replay'
+        offset_path = replay_path + '.offset'
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                if os.path.exists(offset_path):
+                    os.remove(offset_path)
+                os.replace(self.spill_path, replay_path)
+
+        print(f"Replaying spilled history records from {replay_path}")
+        healthy = True
+        batch = []
+        with open(replay_path, 'rb') as f:
+            f.seek(_read_offset(offset_path))
+            for line in iter(f.readline, b''):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('analysis_date'):
+                    record['analysis_date'] = datetime.fromisoformat(record['analysis_date'])
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    healthy = self._replay_batch(batch, healthy)
+                    _write_offset(offset_path, f.tell())
+                    batch = []
+        if batch:
+            self._replay_batch(batch, healthy)
+        os.remove(replay_path)
+        if os.path.exists(offset_path):
+            os.remove(offset_path)
+
+    def _replay_batch(self, batch, healthy):
+        # After one failure the rest goes straight back to the spill file
+        if not healthy:
+            self._spill(batch)
+            return False
+        retry = self._write(batch)
+        if retry:
+            self._spill(retry)
+        self.counters['replayed'] += len(batch) - len(retry)
+        return not retry
+
+def _read_offset(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _write_offset(path, offset):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(str(offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # numpy scalars from the analyzer
+        return value.item()
+    return str(value)
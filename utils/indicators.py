@@ -0,0 +1,137 @@
+import re
+
+class Indicator:
+    """A named set of terms whose occurrences signal a credibility concern"""
+
+    def __init__(self, name, terms, threshold=1, per_term=False, whole_word=True):
+        self.name = name
+        self.terms = [term.lower() for term in terms if term]
+        # Minimum number of hits before the indicator is reported as present
+        self.threshold = threshold
+        # Apply the threshold to each term separately instead of to the total
+        self.per_term = per_term
+        # Only match terms that are not part of a longer word
+        self.whole_word = whole_word
+
+    def is_present(self, term_counts):
+        if self.per_term:
+            return any(count >= self.threshold for count in term_counts.values())
+        return sum(term_counts.values()) >= self.threshold
+
+
+def default_indicators():
+    """Indicators used by NewsAnalyzer out of the box"""
+    return [
+        Indicator('Emotional Language', ['shocking', 'incredible', 'amazing', 'unbelievable']),
+        Indicator('Clickbait Style', ['you won\'t believe', 'shocking truth', 'what happens next'],
+                  whole_word=False),
+        Indicator('Excessive Punctuation', ['!', '?'], threshold=3, per_term=True, whole_word=False),
+    ]
+
+
+class IndicatorEngine:
+    """Scan text for every registered indicator in a single pass
+
+    All terms are compiled into one regular expression shaped like a prefix
+    trie, so the work done at each text position depends on the length of the
+    terms rather than on how many of them are registered.
+    """
+
+    def __init__(self, indicators=None):
+        self.indicators = []
+        self._pattern = None
+        for indicator in (default_indicators() if indicators is None else indicators):
+            self.register(indicator)
+
+    def register(self, indicator):
+        """Add an indicator; the matcher is recompiled on the next scan"""
+        self.indicators = [i for i in self.indicators if i.name != indicator.name] + [indicator]
+        self._pattern = None
+
+    def _compile(self):
+        # Map each term to the indicators that use it and whether they need a whole word
+        self._term_owners = {}
+        for indicator in self.indicators:
+            for term in indicator.terms:
+                self._term_owners.setdefault(term, []).append((indicator.name, indicator.whole_word))
+
+        # The matcher always takes the longest term at a position, so remember
+        # which shorter terms it also starts with ("shocking" in "shocking truth")
+        self._implied = {
+            term: [term[:i] for i in range(1, len(term)) if term[:i] in self._term_owners]
+            for term in self._term_owners
+        }
+
+        if self._term_owners:
+            pattern = _trie_pattern({
+                term: all(whole_word for _, whole_word in owners)
+                for term, owners in self._term_owners.items()
+            })
+            # A zero-width lookahead lets matches start at every position, including overlaps
+            self._pattern = re.compile('(?=(' + pattern + '))', re.IGNORECASE)
+        else:
+            self._pattern = re.compile(r'(?!)')
+
+    def scan(self, text):
+        """Return {indicator name: hit details} for every registered indicator
+
+        Hit details contain whether the indicator is present, the total hit
+        count, per-term counts and the (start, end) offset of each hit.
+        """
+        if self._pattern is None:
+            self._compile()
+
+        text = text or ""
+        hits = {
+            indicator.name: {'present': False, 'count': 0, 'terms': {}, 'offsets': []}
+            for indicator in self.indicators
+        }
+        for match in self._pattern.finditer(text):
+            start = match.start(1)
+            starts_word = start == 0 or not _is_word_char(text[start - 1])
+            matched = match.group(1).lower()
+            for term in [matched] + self._implied.get(matched, []):
+                end = start + len(term)
+                ends_word = end == len(text) or not _is_word_char(text[end])
+                for name, whole_word in self._term_owners.get(term, []):
+                    if whole_word and not (starts_word and ends_word):
+                        continue
+                    hit = hits[name]
+                    hit['count'] += 1
+                    hit['terms'][term] = hit['terms'].get(term, 0) + 1
+                    hit['offsets'].append((start, end))
+
+        for indicator in self.indicators:
+            hit = hits[indicator.name]
+            hit['present'] = indicator.is_present(hit['terms'])
+        return hits
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+def _trie_pattern(terms):
+    """Build a regex matching any term, longest first, from a prefix trie
+
+    terms maps each term to whether it may only end at a word boundary.
+    """
+    trie = {}
+    for term, whole_word in terms.items():
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        # An empty key marks the end of a term
+        node[''] = whole_word
+    return _node_pattern(trie)
+
+def _node_pattern(node):
+    alternatives = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if '' in node:
+        # Ending here is the last resort so that longer terms win
+        alternatives.append(r'(?!\w)' if node[''] else '')
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
@@ -0,0 +1,68 @@
+import asyncio
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batches
+
+    Items submitted within max_wait seconds of each other (or until
+    max_batch_size are waiting) are handed to process_batch in one call, which
+    runs in an executor so the event loop keeps accepting requests. Each
+    caller gets the result at its own position of the returned list.
+    """
+
+    def __init__(self, process_batch, max_batch_size=256, max_wait=0.005, executor=None):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self._pending = []
+        self._timer = None
+        # Running batch tasks; the event loop only keeps weak references to tasks
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'pending': len(self._pending),
+        }
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await loop.run_in_executor(self.executor, self.process_batch, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # The caller may have gone away (e.g. a cancelled request)
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import numpy as np
+import scipy.sparse as sp
+
+BUNDLE_FORMAT = 'fake-news-model-bundle'
+BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_PATH = os.path.join('models', 'fake_news_model.bundle')
+DEFAULT_HASHING_BUNDLE_PATH = os.path.join('models', 'fake_news_model.hashing.bundle')
+MANIFEST_NAME = 'manifest.json'
+
+# TfidfVectorizer settings the lean scorer reproduces exactly
+_SUPPORTED_VECTORIZER = {
+    'analyzer': 'word',
+    'tokenizer': None,
+    'preprocessor': None,
+    'strip_accents': None,
+}
+
+def save_bundle(vectorizer, model, path=DEFAULT_BUNDLE_PATH):
+    """Export a fitted TfidfVectorizer and binary linear classifier as a model bundle
+
+    The bundle is a directory of .npy arrays plus a JSON manifest. The arrays
+    can be memory-mapped, so worker processes share one copy of the model.
+    """
+    params = vectorizer.get_params()
+    for name, expected in _SUPPORTED_VECTORIZER.items():
+        if params[name] != expected:
+            raise ValueError(f"Unsupported vectorizer setting for a bundle: {name}={params[name]!r}")
+    if re.compile(params['token_pattern']).groups:
+        raise ValueError("Unsupported vectorizer setting for a bundle: token_pattern with groups")
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    if coef.shape[0] != 1:
+        raise ValueError("Only binary classifiers can be exported as a bundle")
+
+    # Terms sorted for binary search, with the feature column of each term
+    terms = sorted(vectorizer.vocabulary_)
+    arrays = {
+        'vocabulary': np.array(terms, dtype=np.str_),
+        'vocabulary_index': np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32),
+        'idf': np.asarray(vectorizer.idf_, dtype=np.float64) if params['use_idf']
+               else np.ones(len(terms), dtype=np.float64),
+        'coef': coef[0],
+        'intercept': np.asarray(model.intercept_, dtype=np.float64),
+    }
+    stop_words = sorted(vectorizer.get_stop_words() or [])
+
+    manifest = {
+        'backend': 'tfidf',
+        'classes': model_classes(model),
+        'n_features': len(terms),
+        'vectorizer': {
+            'lowercase': params['lowercase'],
+            'token_pattern': params['token_pattern'],
+            'ngram_range': list(params['ngram_range']),
+            'stop_words': stop_words,
+            'binary': params['binary'],
+            'sublinear_tf': params['sublinear_tf'],
+            'norm': params['norm'],
+        },
+    }
+    return write_bundle(path, arrays, manifest)
+
+def model_classes(model):
+    """Class labels of a fitted classifier as JSON-friendly values"""
+    return [c.item() if hasattr(c, 'item') else c for c in model.classes_]
+
+def write_bundle(path, arrays, manifest):
+    """Write named arrays and a manifest as a bundle directory
+
+    Each file is written under a temporary name and renamed over the old one,
+    manifest last. Running scorers keep the arrays they already mapped, and
+    a scorer opened mid-write never sees a partially written file.
+    """
+    os.makedirs(path, exist_ok=True)
+    checksum = hashlib.sha256()
+    staged = []
+    try:
+        for name, array in arrays.items():
+            staged.append((_write_temp(path, f'{name}.npy', lambda f, array=array: np.save(f, array)),
+                           os.path.join(path, f'{name}.npy')))
+            checksum.update(array.tobytes())
+
+        manifest = dict(
+            {'format': BUNDLE_FORMAT, 'version': BUNDLE_VERSION},
+            **manifest,
+            # Changes whenever any array changes, so caches can key on the manifest
+            checksum=checksum.hexdigest()
+        )
+        staged.append((_write_temp(path, MANIFEST_NAME,
+                                   lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8'))),
+                       os.path.join(path, MANIFEST_NAME)))
+    except BaseException:
+        for temp_path, _ in staged:
+            os.remove(temp_path)
+        raise
+
+    for temp_path, final_path in staged:
+        os.replace(temp_path, final_path)
+    return path
+
+def _write_temp(directory, name, write):
+    """Write a file as a hidden temporary next to its final name and return its path"""
+    temp_path = os.path.join(directory, f'.{name}.{os.getpid()}.tmp')
+    with open(temp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    return temp_path
+
+def load_manifest(path=DEFAULT_BUNDLE_PATH):
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a model bundle")
+    if manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported model bundle version: {manifest.get('version')}")
+    return manifest
+
+def bundle_exists(path=DEFAULT_BUNDLE_PATH):
+    return os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+def load_scorer(path=DEFAULT_BUNDLE_PATH, mmap_mode='r'):
+    """Open the scorer matching the bundle's backend"""
+    backend = load_manifest(path)['backend']
+    if backend == 'tfidf':
+        return BundleScorer(path, mmap_mode)
+    if backend == 'hashing':
+        # Imported here because the hashing scorer needs sklearn
+        from utils.hashing_model import HashingScorer
+        return HashingScorer(path, mmap_mode)
+    raise ValueError(f"Unsupported bundle backend: {backend}")
+
+
+class BundleScorer:
+    """Score texts straight from a model bundle, without sklearn objects or pickle"""
+
+    def __init__(self, path=DEFAULT_BUNDLE_PATH, mmap_mode='r'):
+        self.path = path
+        self.manifest = load_manifest(path)
+        if self.manifest['backend'] != 'tfidf':
+            raise ValueError(f"Unsupported bundle backend: {self.manifest['backend']}")
+        self.manifest_path = os.path.join(path, MANIFEST_NAME)
+
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        self.vocabulary = load('vocabulary')
+        self.vocabulary_index = load('vocabulary_index')
+        self.idf = load('idf')
+        self.coef = load('coef')
+        self.intercept = float(np.asarray(load('intercept'))[0])
+        self.classes = self.manifest['classes']
+        self.n_features = self.manifest['n_features']
+
+        settings = self.manifest['vectorizer']
+        self._lowercase = settings['lowercase']
+        self._token_pattern = re.compile(settings['token_pattern'])
+        self._ngram_range = tuple(settings['ngram_range'])
+        self._stop_words = frozenset(settings['stop_words'])
+        self._binary = settings['binary']
+        self._sublinear_tf = settings['sublinear_tf']
+        self._norm = settings['norm']
+
+    def _terms(self, text):
+        # Same analysis as TfidfVectorizer(analyzer='word')
+        if self._lowercase:
+            text = text.lower()
+        tokens = [t for t in self._token_pattern.findall(text) if t not in self._stop_words]
+        min_n, max_n = self._ngram_range
+        if max_n == 1:
+            return tokens
+        terms = tokens if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform(self, texts):
+        """TF-IDF matrix for texts, matching the exported vectorizer"""
+        doc_terms = [self._terms(text) for text in texts]
+        lengths = [len(terms) for terms in doc_terms]
+        terms = np.array([term for terms in doc_terms for term in terms], dtype=np.str_)
+        rows = np.repeat(np.arange(len(doc_terms)), lengths)
+
+        # Binary search every term of the batch in the sorted vocabulary at once
+        positions = np.searchsorted(self.vocabulary, terms)
+        positions[positions == len(self.vocabulary)] = 0
+        known = self.vocabulary[positions] == terms if len(terms) else np.zeros(0, dtype=bool)
+        columns = self.vocabulary_index[positions[known]]
+        matrix = sp.csr_matrix(
+            (np.ones(len(columns)), (rows[known], columns)),
+            shape=(len(doc_terms), self.n_features)
+        )
+        matrix.sum_duplicates()
+
+        if self._binary:
+            matrix.data[:] = 1.0
+        elif self._sublinear_tf:
+            matrix.data = 1.0 + np.log(matrix.data)
+        matrix.data *= self.idf[matrix.indices]
+        if self._norm in ('l1', 'l2'):
+            squared = matrix.copy()
+            if self._norm == 'l2':
+                squared.data **= 2
+                norms = np.sqrt(np.asarray(squared.sum(axis=1)).ravel())
+            else:
+                squared.data = np.abs(squared.data)
+                norms = np.asarray(squared.sum(axis=1)).ravel()
+            norms[norms == 0] = 1.0
+            matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+        return matrix
+
+    def decision_function(self, texts):
+        return self.transform(texts) @ self.coef + self.intercept
+
+    def predict_proba(self, texts):
+        """Class probabilities in the order of self.classes, like predict_proba in sklearn"""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def export_pickle(pickle_path=os.path.join('models', 'fake_news_model.pkl'), path=DEFAULT_BUNDLE_PATH):
+    """Convert the legacy pickled model into a bundle"""
+    with open(pickle_path, 'rb') as f:
+        model_components = pickle.load(f)
+    return save_bundle(model_components['vectorizer'], model_components['model'], path)
+
+if __name__ == "__main__":
+    # python -m utils.model_bundle [pickle_path] [bundle_path]
+    print(f"Model bundle written to {export_pickle(*sys.argv[1:3])}")
@@ -4,10 +4,70 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import re
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+# Upper bound on distinct tokens kept in the shared lemma cache
+LEMMA_CACHE_SIZE = 100000
+
+# After lowercasing, the only characters that survive cleaning are ASCII letters
+# and whitespace, so a token is simply a run of letters
+_TOKEN_PATTERN = re.compile(r'[a-z]+')
+
+# Words that word_tokenize splits in two (its CONTRACTIONS2 rules that need no
+# apostrophe); the fast path splits them the same way
+_CONTRACTIONS = {
+    'cannot': 'can not', 'gimme': 'gim me', 'gonna': 'gon na',
+    'gotta': 'got ta', 'lemme': 'lem me', 'wanna': 'wan na',
+}
+_CONTRACTION_PATTERN = re.compile(r'(?<![a-z])(' + '|'.join(_CONTRACTIONS) + r')(?![a-z])')
+
+def _fast_tokens(text):
+    """Tokens of text as clean_text's cleaning and word_tokenize produce them"""
+    text = _CONTRACTION_PATTERN.sub(lambda match: _CONTRACTIONS[match.group(1)], text.lower())
+    return _TOKEN_PATTERN.findall(text)
+
+_shared_lemmatizer = WordNetLemmatizer()
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize_cached(token):
+    """Lemmatize a token, memoized across all TextPreprocessor instances"""
+    return _shared_lemmatizer.lemmatize(token)
+
+@lru_cache(maxsize=1)
+def _shared_stop_words():
+    """English stop words as a frozenset built once per process"""
+    return frozenset(stopwords.words('english'))
+
+# Preprocessor owned by a clean_iter worker process, built once by _init_worker
+_worker_preprocessor = None
+
+def _init_worker(options):
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor(**options)
+
+def _clean_chunk(texts):
+    return [_worker_preprocessor.clean_text(text) for text in texts]
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
 class TextPreprocessor:
-    def __init__(self):
+    def __init__(self, fast_mode=False, shared_stop_words=False):
+        # fast_mode swaps Punkt tokenization and per-token lemmatization for a
+        # precompiled regex tokenizer and the shared lemma cache
+        self.fast_mode = fast_mode
+        # Options used to build an identical preprocessor in each worker process
+        self.options = {'fast_mode': fast_mode, 'shared_stop_words': shared_stop_words}
+        
         # Set up NLTK data directory in the project folder
         self.nltk_data_dir = Path.home() / 'nltk_data'
         self.nltk_data_dir.mkdir(parents=True, exist_ok=True)
@@ -29,7 +89,10 @@ class TextPreprocessor:
         # Initialize components
         try:
             self.lemmatizer = WordNetLemmatizer()
-            self.stop_words = set(stopwords.words('english'))
+            if shared_stop_words:
+                self.stop_words = _shared_stop_words()
+            else:
+                self.stop_words = set(stopwords.words('english'))
             print("NLTK components initialized successfully")
         except Exception as e:
             print(f"Warning: Failed to initialize NLTK components: {str(e)}")
@@ -54,6 +117,9 @@ class TextPreprocessor:
         """Clean and preprocess the input text with fallback options"""
         if not text:
             return ""
+        
+        if self.fast_mode:
+            return self._clean_text_fast(text)
             
         try:
             # Convert to lowercase and clean text
@@ -84,3 +150,57 @@ class TextPreprocessor:
             print(f"Warning: Text preprocessing error: {str(e)}")
             # Ultimate fallback: basic cleaning
             return ' '.join(text.split())
+
+    def _clean_text_fast(self, text):
+        """Single regex tokenization with cached lemmatization, same output as clean_text"""
+        try:
+            tokens = _fast_tokens(text)
+            
+            if self.lemmatizer and self.stop_words:
+                stop_words = self.stop_words
+                tokens = [_lemmatize_cached(token) for token in tokens if token not in stop_words]
+            else:
+                tokens = [token for token in tokens if len(token) > 2]
+            
+            return ' '.join(tokens)
+        except Exception as e:
+            print(f"Warning: Text preprocessing error: {str(e)}")
+            return ' '.join(_fast_tokens(text))
+
+    def clean_iter(self, texts, workers=None, chunk_size=64, max_pending_chunks=None):
+        """Clean an iterable of texts in a process pool, yielding results in input order
+
+        Texts are submitted in chunks of chunk_size and at most max_pending_chunks
+        (default: twice the worker count) are in flight, so arbitrarily long
+        streams are processed with bounded memory.
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for text in texts:
+                yield self.clean_text(text)
+            return
+        
+        max_pending_chunks = max_pending_chunks or workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.options,)) as executor:
+            try:
+                for chunk in _chunked(texts, chunk_size):
+                    pending.append(executor.submit(_clean_chunk, chunk))
+                    if len(pending) >= max_pending_chunks:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                # Drop queued work if the consumer stops early
+                for future in pending:
+                    future.cancel()
+
+    def clean_batch(self, texts, workers=None, chunk_size=64):
+        """Clean a batch of texts in a process pool and return them in input order"""
+        return list(self.clean_iter(texts, workers=workers, chunk_size=chunk_size))
+
+    @staticmethod
+    def lemma_cache_info():
+        """Hit/miss statistics of the shared lemma cache"""
+        return _lemmatize_cached.cache_info()
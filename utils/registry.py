@@ -0,0 +1,82 @@
+import threading
+import time
+from utils.preprocessor import TextPreprocessor
+from utils.analyzer import NewsAnalyzer
+from utils.source_checker import SourceChecker
+from utils.fetcher import PageFetcher
+from utils.result_cache import AnalysisCache
+from utils.history_writer import HistoryWriter
+from utils.extraction_cache import ExtractionCache
+
+class Components:
+    """The analysis objects shared by every session in this process"""
+
+    def __init__(self, preprocessor, analyzer, source_checker, page_fetcher, analysis_cache,
+                 history_writer=None, extraction_cache=None):
+        self.preprocessor = preprocessor
+        self.analyzer = analyzer
+        self.source_checker = source_checker
+        self.page_fetcher = page_fetcher
+        self.analysis_cache = analysis_cache
+        self.history_writer = history_writer
+        self.extraction_cache = extraction_cache
+
+
+_components = None
+_components_lock = threading.Lock()
+
+def get_components():
+    """Return the process-wide components, building them on first use
+
+    Streamlit re-executes main.py on every interaction, but imported modules
+    stay loaded, so the model is unpickled and NLTK checked once per process.
+    """
+    global _components
+    if _components is None:
+        with _components_lock:
+            if _components is None:
+                _components = _build_components()
+    return _components
+
+def warm_up():
+    """Build the components and run one analysis so the first request is not slow"""
+    start = time.perf_counter()
+    components = get_components()
+    sample = "Scientists publish findings on climate change impact"
+    cleaned = components.preprocessor.clean_text(sample)
+    components.analyzer.analyze_text(cleaned)
+    print(f"Components warmed up in {time.perf_counter() - start:.2f}s")
+    return components
+
+def _build_components():
+    analyzer = NewsAnalyzer()
+    session_factory = _history_session_factory()
+    return Components(
+        # Fast mode cleans text into the same tokens as the default NLTK path, so
+        # the model sees the features it was trained on, just produced faster
+        preprocessor=TextPreprocessor(fast_mode=True, shared_stop_words=True),
+        analyzer=analyzer,
+        source_checker=SourceChecker(),
+        page_fetcher=PageFetcher(),
+        analysis_cache=AnalysisCache(model_path=analyzer.model_path,
+                                     session_factory=session_factory),
+        history_writer=HistoryWriter(session_factory) if session_factory else None,
+        extraction_cache=_extraction_cache()
+    )
+
+def _history_session_factory():
+    # History is optional; without a database the cache stays in memory and nothing is saved
+    try:
+        from utils.database import SessionLocal
+        return SessionLocal
+    except Exception as e:
+        print(f"Warning: history cache tier disabled: {str(e)}")
+        return None
+
+def _extraction_cache():
+    # Like history, the cache is an optimization; a read-only disk just means extracting every time
+    try:
+        return ExtractionCache()
+    except Exception as e:
+        print(f"Warning: extraction cache disabled: {str(e)}")
+        return None
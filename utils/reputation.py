@@ -0,0 +1,195 @@
+import csv
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+DEFAULT_REPUTATION_PATH = os.path.join('data', 'domain_reputation.csv')
+
+# Reputation labels in the data file, stored as one byte per domain
+REPUTATIONS = ('credible', 'fake', 'satire')
+
+# Multi-label public suffixes common among news sites; a full public suffix
+# list can be loaded instead with public_suffix_path
+DEFAULT_PUBLIC_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'ltd.uk', 'plc.uk',
+    'com.au', 'net.au', 'org.au', 'gov.au', 'edu.au',
+    'co.nz', 'org.nz', 'co.za', 'co.in', 'net.in', 'org.in', 'co.jp', 'ne.jp', 'or.jp',
+    'co.kr', 'or.kr', 'com.br', 'com.ar', 'com.mx', 'com.tr', 'com.cn', 'com.hk',
+    'com.sg', 'com.my', 'com.ph', 'com.pk', 'com.ng', 'com.eg', 'com.sa', 'co.il', 'co.id',
+    'blogspot.com', 'wordpress.com', 'github.io', 'substack.com', 'medium.com', 'tumblr.com',
+}
+
+def normalize_domain(domain):
+    """Lowercase ASCII form of a host name, without port, credentials or trailing dot"""
+    domain = domain.strip().lower().rsplit('@', 1)[-1]
+    if domain.startswith('['):
+        return domain
+    domain = domain.split(':', 1)[0].rstrip('.')
+    if domain.isascii():
+        return domain
+    try:
+        return domain.encode('idna').decode('ascii')
+    except UnicodeError:
+        return domain
+
+def load_public_suffixes(path):
+    """Suffixes from a public suffix list file (publicsuffix.org format)
+
+    Wildcard rules are kept as their base suffix and exception rules are
+    ignored, which is close enough for matching news domains.
+    """
+    suffixes = set()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split()[0] if line.strip() else ''
+            if not line or line.startswith('//') or line.startswith('!'):
+                continue
+            suffixes.add(normalize_domain(line.removeprefix('*.')))
+    return suffixes
+
+
+class _Index:
+    """Listed domains in flat arrays sorted by hash, searched with bisect
+
+    A few bytes per domain instead of a dict entry and a string object each.
+    The hash only locates the row; the stored name is compared to confirm it.
+    """
+
+    def __init__(self, entries, mtime):
+        keyed = sorted((hash(domain), domain, code) for domain, code in entries.items())
+        self.hashes = array('q', [key for key, _, _ in keyed])
+        self.codes = bytes(code for _, _, code in keyed)
+        self._names = ''.join(domain for _, domain, _ in keyed)
+        self._offsets = array('I', [0])
+        for _, domain, _ in keyed:
+            self._offsets.append(self._offsets[-1] + len(domain))
+        self.mtime = mtime
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def find(self, domain):
+        key = hash(domain)
+        position = bisect_left(self.hashes, key)
+        while position < len(self.hashes) and self.hashes[position] == key:
+            if self._names[self._offsets[position]:self._offsets[position + 1]] == domain:
+                return self.codes[position]
+            position += 1
+        return None
+
+
+class DomainReputation:
+    """Known credible and fake news domains, loaded from a CSV file
+
+    The file has 'domain' and 'reputation' columns (credible, fake or
+    satire). A lookup matches the host itself or any parent domain down to
+    its registrable domain (eTLD+1), so edition.bbc.com matches bbc.com; the
+    most specific listed domain wins. Lookups cost at most one binary search
+    per label. The file is re-read when its modification time changes, checked
+    at most every check_interval seconds, so lists can be updated in place.
+    """
+
+    def __init__(self, path=DEFAULT_REPUTATION_PATH, public_suffix_path=None, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.public_suffixes = (load_public_suffixes(public_suffix_path) if public_suffix_path
+                                else set(DEFAULT_PUBLIC_SUFFIXES))
+        self._index = _Index({}, None)
+        # Modification time of the last version read, loaded or not
+        self._seen_mtime = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def lookup(self, domain):
+        """Return {'domain', 'reputation'} for the closest listed parent of domain, or None"""
+        self._maybe_reload()
+        index = self._index
+        labels = normalize_domain(domain).split('.')
+        for start in range(self._registrable_start(labels) + 1):
+            code = index.find('.'.join(labels[start:]))
+            if code is not None:
+                return {'domain': '.'.join(labels[start:]), 'reputation': REPUTATIONS[code]}
+        return None
+
+    def reputation(self, domain):
+        """'credible', 'fake', 'satire' or None"""
+        match = self.lookup(domain)
+        return match['reputation'] if match else None
+
+    def registrable_domain(self, domain):
+        """The eTLD+1 of domain, e.g. news.bbc.co.uk -> bbc.co.uk"""
+        labels = normalize_domain(domain).split('.')
+        return '.'.join(labels[self._registrable_start(labels):])
+
+    def reload(self):
+        """Re-read the file now; keeps the current lists if it cannot be read"""
+        with self._reload_lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._index.mtime is not None:
+                    print(f"Warning: domain reputation file {self.path} is missing; keeping the loaded lists")
+                else:
+                    print(f"Warning: domain reputation file {self.path} not found; no domains are known")
+                return False
+            self._seen_mtime = mtime
+            try:
+                entries, skipped = self._read(self.path)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"Warning: could not load domain reputation file {self.path}: {str(e)}")
+                return False
+            self._index = _Index(entries, mtime)
+            if skipped:
+                print(f"Warning: skipped {skipped} invalid rows in {self.path}")
+            return True
+
+    def __len__(self):
+        return len(self._index)
+
+    def _registrable_start(self, labels):
+        # Longest public suffix first, so co.uk wins over uk
+        for start in range(1, len(labels)):
+            if '.'.join(labels[start:]) in self.public_suffixes:
+                return start - 1
+        return max(0, len(labels) - 2)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._seen_mtime:
+            self.reload()
+
+    def _read(self, path):
+        entries = {}
+        skipped = 0
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = [name.strip().lower() for name in next(reader, [])]
+            if 'domain' not in header or 'reputation' not in header:
+                raise ValueError("expected 'domain' and 'reputation' columns")
+            domain_column = header.index('domain')
+            reputation_column = header.index('reputation')
+            codes = {reputation: code for code, reputation in enumerate(REPUTATIONS)}
+            for row in reader:
+                if not row or row[0].lstrip().startswith('#'):
+                    continue
+                try:
+                    domain = normalize_domain(row[domain_column])
+                    code = codes[row[reputation_column].strip().lower()]
+                except (IndexError, KeyError):
+                    skipped += 1
+                    continue
+                if not domain:
+                    skipped += 1
+                    continue
+                entries[domain] = code
+        return entries, skipped
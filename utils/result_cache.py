@@ -0,0 +1,117 @@
+import copy
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from utils.cache import TTLCache
+
+def _hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """Cache analysis results by a hash of the cleaned text and the model version
+
+    Lookups go to an in-process LRU first and then, if a session factory is
+    given, to article_history rows with the same content hash. Submitted text
+    is also mapped to its content hash, so an exact repeat skips preprocessing
+    as well as inference. Every entry is dropped when the model file changes.
+
+    History lookups run on a background thread and are given up after
+    history_timeout seconds, so a slow database delays a request by at most
+    that much. While an earlier lookup is still running, new misses skip
+    the history tier instead of queueing behind it.
+    """
+
+    def __init__(self, model_path=os.path.join('models', 'fake_news_model.pkl'),
+                 maxsize=1024, session_factory=None, history_timeout=0.2):
+        self.model_path = model_path
+        self.session_factory = session_factory
+        self.history_timeout = history_timeout
+        self._history_executor = (ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-lookup')
+                                  if session_factory is not None else None)
+        self._history_lookup = None
+        self.results = TTLCache(maxsize=maxsize)
+        # Hash of the submitted text -> content hash of its cleaned text
+        self.content_keys = TTLCache(maxsize=maxsize)
+        self._model_signature = None
+        self._model_version = None
+
+    def model_version(self):
+        """Hash of the model file, recomputed only when its size or mtime changes"""
+        stat = os.stat(self.model_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._model_signature:
+            with open(self.model_path, 'rb') as f:
+                self._model_version = hashlib.sha256(f.read()).hexdigest()
+            self._model_signature = signature
+            self.results.clear()
+            self.content_keys.clear()
+        return self._model_version
+
+    def content_hash(self, cleaned_text):
+        return _hash(self.model_version(), cleaned_text)
+
+    def analyze(self, text, preprocessor, analyzer):
+        """Return the analysis of text, running preprocessing and inference only on a miss
+
+        The result carries the 'content_hash' it was cached under.
+        """
+        raw_key = _hash(self.model_version(), 'raw', text)
+        content_hash = self.content_keys.get(raw_key)
+        if content_hash is not None:
+            result = self.results.get(content_hash)
+            if result is not None:
+                return copy.deepcopy(result)
+
+        cleaned_text = preprocessor.clean_text(text)
+        content_hash = self.content_hash(cleaned_text)
+        result = self.results.get(content_hash)
+        if result is None:
+            result = self._load_from_history(content_hash, cleaned_text, analyzer)
+        if result is None:
+            result = analyzer.analyze_text(cleaned_text)
+        result = dict(result, content_hash=content_hash)
+
+        self.results.set(content_hash, result)
+        self.content_keys.set(raw_key, content_hash)
+        return copy.deepcopy(result)
+
+    def stats(self):
+        return {'results': self.results.stats(), 'content_keys': self.content_keys.stats()}
+
+    def _load_from_history(self, content_hash, cleaned_text, analyzer):
+        """Rebuild a result from a stored analysis of the same content, if one is found in time"""
+        if self._history_executor is None:
+            return None
+        lookup = self._history_lookup
+        if lookup is not None and not lookup.done():
+            return None
+        lookup = self._history_lookup = self._history_executor.submit(self._find_in_history, content_hash)
+        try:
+            stored = lookup.result(timeout=self.history_timeout)
+        except FutureTimeoutError:
+            print(f"Warning: history cache lookup took over {self.history_timeout}s; analyzing instead")
+            return None
+        if stored is None:
+            return None
+        # Indicators are not stored, but a single scan of the text is cheap
+        return dict(stored, indicators=analyzer.get_credibility_indicators(cleaned_text))
+
+    def _find_in_history(self, content_hash):
+        # Imported here so the cache works without a configured database
+        from utils.database import ArticleHistory
+
+        session = self.session_factory()
+        try:
+            entry = ArticleHistory.find_by_content_hash(session, content_hash)
+            if entry is None:
+                return None
+            return {'is_fake': entry.is_fake, 'confidence': entry.confidence_score}
+        except Exception as e:
+            print(f"Warning: history cache lookup failed: {str(e)}")
+            return None
+        finally:
+            session.close()
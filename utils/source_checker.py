@@ -1,28 +1,67 @@
 import re
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import copy
+import threading
 import ssl
 import socket
 import whois
 from datetime import datetime
+from utils.cache import TTLCache, SQLiteCacheStore
+from utils.fetcher import describe_certificate
+from utils.reputation import DomainReputation, DEFAULT_REPUTATION_PATH
+
+# TLS probe result when no valid certificate could be confirmed
+_NO_TLS = {'has_ssl': False, 'issuer': None, 'expires': None, 'days_to_expiry': None}
+# Errors that show the host has no valid TLS, as opposed to a probe that failed
+_NO_TLS_ERRORS = (ssl.SSLError, ConnectionRefusedError, requests.exceptions.SSLError)
 
 class SourceChecker:
-    def __init__(self):
-        # List of known credible news domains
-        self.credible_domains = {
-            'reuters.com', 'apnews.com', 'npr.org', 'bbc.com', 'bbc.co.uk',
-            'nytimes.com', 'wsj.com', 'washingtonpost.com', 'theguardian.com',
-            'bloomberg.com', 'economist.com', 'forbes.com', 'time.com'
-        }
+    def __init__(self, ssl_timeout=5, whois_timeout=10, max_workers=16, per_host_limit=2,
+                 cache_size=10000, cache_path=None, whois_ttl=7 * 24 * 3600,
+                 tls_ttl=24 * 3600, score_ttl=3600, ssl_probe='handshake',
+                 reputation_path=DEFAULT_REPUTATION_PATH, public_suffix_path=None):
+        # Per-probe time budgets in seconds; a probe that overruns counts as failed
+        self.ssl_timeout = ssl_timeout
+        self.whois_timeout = whois_timeout
+        self.max_workers = max_workers
+        # How has_ssl is determined: 'handshake' (TLS handshake on port 443 only),
+        # 'head' (HEAD request without redirects) or 'get' (streamed GET)
+        if ssl_probe not in ('handshake', 'head', 'get'):
+            raise ValueError(f"Unknown ssl_probe mode: {ssl_probe}")
+        self.ssl_probe = ssl_probe
+        # Maximum number of concurrent checks against one host in check_many
+        self.per_host_limit = per_host_limit
         
-        # List of known fake news domains
-        self.fake_domains = {
-            'newsexaminer.net', 'worldnewsdailyreport.com', 'nationalreport.net',
-            'empirenews.net', 'huzlers.com', 'theonion.com'  # Note: theonion.com is satire
-        }
+        # Pooled HTTP session shared by every probe
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # SSL and WHOIS probes run concurrently on this pool
+        self._probe_executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                  thread_name_prefix='source-probe')
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        
+        # Per-domain result caches, optionally persisted to a SQLite file
+        self.cache_store = SQLiteCacheStore(cache_path) if cache_path else None
+        self.whois_cache = TTLCache(cache_size, whois_ttl, self.cache_store, namespace='whois')
+        self.tls_cache = TTLCache(cache_size, tls_ttl, self.cache_store, namespace='tls')
+        self.score_cache = TTLCache(cache_size, score_ttl, self.cache_store, namespace='score')
+        
+        # Known credible and fake (or satirical) news domains, re-read when the file changes
+        self.reputation = DomainReputation(reputation_path, public_suffix_path=public_suffix_path)
+
+    def check_source_credibility(self, url, page=None):
+        """Main method to check source credibility
 
-    def check_source_credibility(self, url):
-        """Main method to check source credibility"""
+        page is an optional FetchedPage for url; its TLS details are used instead
+        of probing the host again.
+        """
         try:
             parsed_url = urlparse(url)
             domain = parsed_url.netloc.lower()
@@ -39,11 +78,37 @@ class SourceChecker:
                     'details': "Invalid URL format"
                 }
 
-            # Initialize credibility checks
-            is_known_credible = domain in self.credible_domains
-            is_known_fake = domain in self.fake_domains
-            has_ssl = self._check_ssl(url)
-            domain_age = self._check_domain_age(domain)
+            # Subdomains such as edition.bbc.com take their site's reputation
+            reputation = self.reputation.reputation(domain)
+            is_known_credible = reputation == 'credible'
+            is_known_fake = reputation in ('fake', 'satire')
+
+            # has_ssl from the head and get probes depends on the scheme, so their
+            # results and the scores built on them are cached per scheme and domain
+            scheme_key = f"{parsed_url.scheme.lower()}://{domain}"
+            tls_key = domain if self.ssl_probe == 'handshake' else scheme_key
+
+            # A cached score is stale if the reputation lists changed since it was computed
+            cached_result = self.score_cache.get(scheme_key)
+            if (cached_result is not None
+                    and cached_result['factors']['is_known_credible'] == is_known_credible
+                    and cached_result['factors']['is_known_fake'] == is_known_fake):
+                return copy.deepcopy(cached_result)
+
+            # Run the network probes concurrently, each with its own time budget,
+            # unless the domain's result is still cached
+            tls_info = self.tls_cache.get(tls_key)
+            if page is not None:
+                tls_info = page.tls_info or dict(_NO_TLS)
+            domain_age = self.whois_cache.get(domain)
+            ssl_probe = None if tls_info is not None else self._probe_executor.submit(self._check_ssl, url)
+            whois_probe = None if domain_age is not None else self._probe_executor.submit(self._check_domain_age, domain)
+            if ssl_probe is not None:
+                tls_info = self._probe_result(ssl_probe, self.ssl_timeout, _NO_TLS,
+                                              self.tls_cache, tls_key, cacheable=lambda info: info['has_ssl'])
+            if whois_probe is not None:
+                domain_age = self._probe_result(whois_probe, self.whois_timeout, 0, self.whois_cache, domain)
+            has_ssl = tls_info['has_ssl']
             suspicious_patterns = self._check_suspicious_patterns(url, domain)
 
             # Calculate credibility score (0-100)
@@ -62,7 +127,7 @@ class SourceChecker:
             # Ensure score stays within 0-100 range
             credibility_score = max(0, min(100, base_score))
 
-            return {
+            result = {
                 'credibility_score': credibility_score,
                 'factors': {
                     'is_known_credible': is_known_credible,
@@ -71,10 +136,21 @@ class SourceChecker:
                     'domain_age': domain_age,
                     'suspicious_patterns': suspicious_patterns
                 },
+                'certificate': {
+                    'issuer': tls_info['issuer'],
+                    'expires': tls_info['expires'],
+                    'days_to_expiry': tls_info['days_to_expiry']
+                },
                 'details': self._generate_details(credibility_score, is_known_credible, 
                                                 is_known_fake, has_ssl, domain_age, 
-                                                suspicious_patterns)
+                                                suspicious_patterns, tls_info)
             }
+            
+            # Only cache scores built from probes that actually finished; a probe that
+            # timed out or raised left has_ssl or domain_age at its fallback value
+            if all(probe is None or self._probe_succeeded(probe) for probe in (ssl_probe, whois_probe)):
+                self.score_cache.set(scheme_key, copy.deepcopy(result))
+            return result
         except Exception as e:
             return {
                 'credibility_score': 0,
@@ -88,27 +164,111 @@ class SourceChecker:
                 'details': f"Error checking credibility: {str(e)}"
             }
 
+    def check_many(self, urls, max_workers=None):
+        """Check many URLs concurrently and return the results in input order
+
+        At most per_host_limit checks run against the same host at once.
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers,
+                                thread_name_prefix='source-check') as executor:
+            return list(executor.map(self._check_with_host_limit, urls))
+
+    def cache_stats(self):
+        """Hit/miss counters for each domain cache"""
+        return {
+            'whois': self.whois_cache.stats(),
+            'tls': self.tls_cache.stats(),
+            'score': self.score_cache.stats()
+        }
+
+    def close(self):
+        """Release the probe threads, pooled HTTP connections and cache file"""
+        self._probe_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        if self.cache_store is not None:
+            self.cache_store.close()
+
+    def _check_with_host_limit(self, url):
+        domain = urlparse(url).netloc.lower()
+        with self._host_semaphore(domain):
+            return self.check_source_credibility(url)
+
+    def _host_semaphore(self, domain):
+        with self._host_semaphores_lock:
+            if domain not in self._host_semaphores:
+                self._host_semaphores[domain] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[domain]
+
+    def _probe_result(self, future, timeout, default, cache=None, key=None, cacheable=bool):
+        """Wait for a probe up to timeout seconds, falling back to default
+
+        Probes raise when they cannot measure anything. Only results that pass
+        cacheable are cached; the rest are re-probed on the next check.
+        """
+        try:
+            value = future.result(timeout=timeout)
+            if cache is not None and cacheable(value):
+                cache.set(key, value)
+            return value
+        except FutureTimeoutError:
+            future.cancel()
+            return default
+        except Exception:
+            return default
+
+    def _probe_succeeded(self, future):
+        return future.done() and not future.cancelled() and future.exception() is None
+
     def _check_ssl(self, url):
-        """Check if the website has SSL certificate"""
+        """Check if the website has a valid SSL certificate
+
+        Returns has_ssl plus the certificate issuer and expiry, which only the
+        handshake probe can see. A refused connection or rejected certificate
+        means no TLS; other errors (timeouts, DNS failures) are raised.
+        """
         try:
-            response = requests.get(url, verify=True)
-            return response.url.startswith('https://')
-        except:
-            return False
+            if self.ssl_probe == 'handshake':
+                return self._probe_tls_handshake(url)
+            if self.ssl_probe == 'head':
+                return self._probe_head(url)
+            # Headers are enough to know the final URL, so do not download the body
+            with self.session.get(url, verify=True, timeout=self.ssl_timeout, stream=True) as response:
+                return dict(_NO_TLS, has_ssl=response.url.startswith('https://'))
+        except _NO_TLS_ERRORS:
+            return dict(_NO_TLS)
+
+    def _probe_tls_handshake(self, url):
+        """Validate the host's certificate with a bare TLS handshake, no HTTP traffic"""
+        parsed_url = urlparse(url)
+        host = parsed_url.hostname
+        port = parsed_url.port if parsed_url.scheme == 'https' and parsed_url.port else 443
+        context = ssl.create_default_context()
+        with socket.create_connection((host, port), timeout=self.ssl_timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+                return describe_certificate(tls_sock.getpeercert())
+
+    def _probe_head(self, url):
+        """HEAD the URL without following redirects; https or a redirect to https counts"""
+        response = self.session.head(url, verify=True, timeout=self.ssl_timeout, allow_redirects=False)
+        location = response.headers.get('Location', '') if response.is_redirect else ''
+        return dict(_NO_TLS, has_ssl=url.startswith('https://') or location.startswith('https://'))
 
     def _check_domain_age(self, domain):
-        """Check domain age in years"""
-        try:
-            w = whois.whois(domain)
-            if w.creation_date:
-                if isinstance(w.creation_date, list):
-                    creation_date = w.creation_date[0]
-                else:
-                    creation_date = w.creation_date
-                age = (datetime.now() - creation_date).days / 365
-                return round(age)
-        except:
-            pass
+        """Check domain age in years, 0 if the record has no creation date
+
+        Lookup errors are raised so they are not mistaken for a new domain.
+        """
+        w = whois.whois(domain)
+        if w.creation_date:
+            if isinstance(w.creation_date, list):
+                creation_date = w.creation_date[0]
+            else:
+                creation_date = w.creation_date
+            age = (datetime.now() - creation_date).days / 365
+            return round(age)
         return 0
 
     def _check_suspicious_patterns(self, url, domain):
@@ -123,7 +283,7 @@ class SourceChecker:
         return any(re.search(pattern, domain.lower()) for pattern in suspicious_patterns)
 
     def _generate_details(self, score, is_known_credible, is_known_fake, has_ssl, 
-                         domain_age, suspicious_patterns):
+                         domain_age, suspicious_patterns, tls_info=None):
         """Generate detailed explanation of credibility assessment"""
         details = []
         
@@ -142,6 +302,10 @@ class SourceChecker:
             details.append("❌ Known for publishing fake or satirical news")
         if has_ssl:
             details.append("✓ Secure website connection (HTTPS)")
+            if tls_info and tls_info['issuer']:
+                details.append(f"✓ Certificate issued by {tls_info['issuer']}")
+            if tls_info and tls_info['days_to_expiry'] is not None and tls_info['days_to_expiry'] < 14:
+                details.append(f"⚠️ Certificate expires in {tls_info['days_to_expiry']} days")
         else:
             details.append("⚠️ Insecure website connection")
         if domain_age > 5:
@@ -0,0 +1,250 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from sklearn.linear_model import SGDClassifier
+from utils.hashing_model import (
+    StreamingIdf, make_hashing_vectorizer, save_hashing_bundle, tfidf_transform, DEFAULT_N_FEATURES
+)
+from utils.model_bundle import DEFAULT_HASHING_BUNDLE_PATH
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Label values accepted in corpus files, mapped to 1 (fake) / 0 (real)
+_LABELS = {
+    '1': 1, 'true': 1, 'fake': 1, 'yes': 1,
+    '0': 0, 'false': 0, 'real': 0, 'genuine': 0, 'no': 0,
+}
+
+def parse_label(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value != 0)
+    label = _LABELS.get(str(value).strip().lower())
+    if label is None:
+        raise ValueError(f"Unrecognized label: {value!r}")
+    return label
+
+def iter_jsonl(path, text_field='text', label_field='label'):
+    """Yield (text, label) pairs from a JSON Lines file"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record[text_field], parse_label(record[label_field])
+
+def iter_csv(path, text_field='text', label_field='label'):
+    """Yield (text, label) pairs from a CSV file with a header row"""
+    # Article bodies easily exceed the default field size limit
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield row[text_field], parse_label(row[label_field])
+
+def iter_history(session_factory, chunk_size=1000):
+    """Yield (content, is_fake) pairs from article_history, reading chunk_size rows at a time"""
+    from utils.database import ArticleHistory
+
+    last_id = 0
+    while True:
+        session = session_factory()
+        try:
+            rows = (
+                session.query(ArticleHistory.id, ArticleHistory.content, ArticleHistory.is_fake)
+                .filter(ArticleHistory.id > last_id, ArticleHistory.is_fake.isnot(None))
+                .order_by(ArticleHistory.id)
+                .limit(chunk_size)
+                .all()
+            )
+        finally:
+            session.close()
+        if not rows:
+            return
+        for row in rows:
+            if row.content:
+                yield row.content, int(row.is_fake)
+        last_id = rows[-1].id
+
+def iter_corpus(sources, text_field='text', label_field='label', session_factory=None):
+    """Yield (text, label) pairs from each source in turn
+
+    A source is a .jsonl/.json or .csv path, or 'history' for the article_history table.
+    """
+    for source in sources:
+        if source == 'history':
+            if session_factory is None:
+                from utils.database import SessionLocal
+                session_factory = SessionLocal
+            yield from iter_history(session_factory)
+        elif source.endswith(('.jsonl', '.json')):
+            yield from iter_jsonl(source, text_field, label_field)
+        elif source.endswith('.csv'):
+            yield from iter_csv(source, text_field, label_field)
+        else:
+            raise ValueError(f"Unsupported corpus source: {source}")
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class StreamingTrainer:
+    """Fit a hashing-vectorizer model on a corpus too large for memory
+
+    Only one chunk of documents is held at a time. The default two-pass mode
+    first accumulates IDF statistics over the whole stream and then fits the
+    classifier with partial_fit; single_pass updates IDF as it goes, which
+    reads the data once at the cost of early chunks seeing incomplete weights.
+
+    Checkpoints go to checkpoint_path (output_path + '.checkpoint' by
+    default) and only the finished model is written to output_path, so a
+    server started mid-training never loads a half-trained model.
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, chunk_size=10000,
+                 output_path=DEFAULT_HASHING_BUNDLE_PATH, checkpoint_path=None, checkpoint_every=100000,
+                 single_pass=False, epochs=1):
+        self.vectorizer = make_hashing_vectorizer(n_features=n_features)
+        self.idf = StreamingIdf(n_features)
+        self.model = SGDClassifier(loss='log_loss', random_state=42)
+        self.chunk_size = chunk_size
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+        self.checkpoint_every = checkpoint_every
+        self.single_pass = single_pass
+        self.epochs = epochs
+        self.classes = [0, 1]
+
+    def fit(self, corpus_factory):
+        """Train on corpus_factory(), a callable returning a fresh (text, label) iterator
+
+        A callable is needed because two-pass training and extra epochs read
+        the corpus more than once.
+        """
+        if not self.single_pass:
+            self._run("idf", corpus_factory(), self._idf_chunk)
+        for epoch in range(self.epochs):
+            self._run(f"fit epoch {epoch + 1}", corpus_factory(), self._fit_chunk, checkpoints=True)
+        self.checkpoint(self.output_path)
+        return self
+
+    def checkpoint(self, path=None):
+        """Write the current model as a hashing bundle, to checkpoint_path by default"""
+        if not hasattr(self.model, 'coef_'):
+            return
+        save_hashing_bundle(self.vectorizer, self.idf.idf, self.model, path or self.checkpoint_path)
+
+    def _idf_chunk(self, texts, labels):
+        self.idf.partial_fit(self.vectorizer.transform(texts))
+
+    def _fit_chunk(self, texts, labels):
+        counts = self.vectorizer.transform(texts)
+        if self.single_pass:
+            self.idf.partial_fit(counts)
+        self.model.partial_fit(tfidf_transform(counts, self.idf.idf), labels, classes=self.classes)
+
+    def _run(self, stage, corpus, handle_chunk, checkpoints=False):
+        start = time.perf_counter()
+        processed = 0
+        next_checkpoint = self.checkpoint_every
+        for chunk in iter_chunks(corpus, self.chunk_size):
+            texts = [text for text, _ in chunk]
+            labels = [label for _, label in chunk]
+            handle_chunk(texts, labels)
+            processed += len(chunk)
+
+            elapsed = time.perf_counter() - start
+            peak = peak_memory_mb()
+            print(f"[{stage}] {processed} docs, {processed / elapsed:.0f} docs/s, "
+                  f"peak memory {'n/a' if peak is None else f'{peak:.0f}MB'}")
+
+            if checkpoints and processed >= next_checkpoint:
+                self.checkpoint()
+                print(f"[{stage}] checkpoint written to {self.checkpoint_path}")
+                next_checkpoint += self.checkpoint_every
+        return processed
+
+
+# Candidate settings for search_hyperparameters
+DEFAULT_PARAM_GRID = {
+    'tfidf__max_features': [5000, 20000, None],
+    'tfidf__ngram_range': [(1, 1), (1, 2)],
+    'tfidf__sublinear_tf': [False, True],
+    'clf__C': [0.1, 1.0, 10.0],
+}
+
+def search_hyperparameters(texts, labels, folds=5, param_grid=None, n_iter=None,
+                           n_jobs=-1, cache_dir=None):
+    """Cross-validated grid (or random, with n_iter) search over vectorizer and C
+
+    Candidates are evaluated in parallel across all cores. With cache_dir the
+    pipeline caches each fitted vectorizer and its transformed fold, so
+    candidates that differ only in classifier settings do not re-tokenize.
+    Returns the fitted search and a JSON-friendly metrics report.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+    from sklearn.pipeline import Pipeline
+
+    pipeline = Pipeline(
+        [('tfidf', TfidfVectorizer()), ('clf', LogisticRegression(max_iter=1000, random_state=42))],
+        memory=cache_dir
+    )
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    scoring = ['accuracy', 'precision', 'recall', 'f1', 'roc_auc']
+    common = dict(cv=cv, scoring=scoring, refit='f1', n_jobs=n_jobs, error_score='raise')
+    if n_iter:
+        search = RandomizedSearchCV(pipeline, param_grid, n_iter=n_iter, random_state=42, **common)
+    else:
+        search = GridSearchCV(pipeline, param_grid, **common)
+
+    start = time.perf_counter()
+    search.fit(texts, labels)
+    elapsed = time.perf_counter() - start
+
+    results = search.cv_results_
+    candidates = []
+    for i, params in enumerate(results['params']):
+        candidate = {'params': _json_params(params)}
+        for metric in scoring:
+            candidate[metric] = {
+                'mean': float(results[f'mean_test_{metric}'][i]),
+                'std': float(results[f'std_test_{metric}'][i]),
+            }
+        candidate['mean_fit_seconds'] = float(results['mean_fit_time'][i])
+        candidates.append(candidate)
+    candidates.sort(key=lambda c: c['f1']['mean'], reverse=True)
+
+    report = {
+        'documents': len(texts),
+        'folds': folds,
+        'search': 'random' if n_iter else 'grid',
+        'candidates_evaluated': len(candidates),
+        'search_seconds': round(elapsed, 3),
+        'best_params': _json_params(search.best_params_),
+        'best_cv_f1': float(search.best_score_),
+        'candidates': candidates,
+    }
+    return search, report
+
+def _json_params(params):
+    return {name: list(value) if isinstance(value, tuple) else value for name, value in params.items()}